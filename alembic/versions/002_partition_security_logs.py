@@ -0,0 +1,108 @@
+"""Range-partition security_logs by day
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:00:00.000000
+
+Converts security_logs into a declaratively partitioned table (one partition
+per UTC day plus a DEFAULT catch-all) so retention becomes a partition
+DETACH/DROP instead of a bulk DELETE. Future partitions are created by
+database.ensure_security_log_partitions(), run from the app's maintenance loop.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD_DAYS = 7
+
+
+def upgrade():
+    # Keep the old heap around until its rows are copied
+    op.execute('ALTER TABLE security_logs RENAME TO security_logs_legacy')
+    op.execute('ALTER TABLE security_logs_legacy RENAME CONSTRAINT security_logs_pkey TO security_logs_legacy_pkey')
+
+    # The partition key must be part of the primary key
+    op.execute('''
+        CREATE TABLE security_logs (
+            id UUID NOT NULL,
+            event_type VARCHAR(50) NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            client_ip INET,
+            details JSONB,
+            severity VARCHAR(20),
+            CONSTRAINT security_logs_pkey PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    ''')
+    op.execute('CREATE TABLE security_logs_default PARTITION OF security_logs DEFAULT')
+
+    # Daily partitions covering existing rows through the week ahead
+    op.execute(f'''
+        DO $$
+        DECLARE
+            day DATE;
+            last_day DATE := (now() AT TIME ZONE 'UTC')::date + {PARTITIONS_AHEAD_DAYS};
+        BEGIN
+            SELECT LEAST(
+                COALESCE(MIN(("timestamp" AT TIME ZONE 'UTC')::date), (now() AT TIME ZONE 'UTC')::date),
+                (now() AT TIME ZONE 'UTC')::date
+            ) INTO day FROM security_logs_legacy;
+
+            WHILE day <= last_day LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF security_logs FOR VALUES FROM (%L) TO (%L)',
+                    'security_logs_p' || to_char(day, 'YYYYMMDD'),
+                    day::text || ' 00:00:00+00',
+                    (day + 1)::text || ' 00:00:00+00'
+                );
+                day := day + 1;
+            END LOOP;
+        END $$;
+    ''')
+
+    op.execute('''
+        INSERT INTO security_logs (id, event_type, "timestamp", client_ip, details, severity)
+        SELECT id, event_type, COALESCE("timestamp", now()), client_ip, details, severity
+        FROM security_logs_legacy
+    ''')
+    op.execute('DROP TABLE security_logs_legacy')
+
+    # Indexes on the parent cascade to every current and future partition
+    op.create_index('idx_security_logs_event_type', 'security_logs', ['event_type'])
+    op.create_index('idx_security_logs_timestamp', 'security_logs', ['timestamp'])
+    op.create_index('idx_security_logs_client_ip', 'security_logs', ['client_ip'])
+
+
+def downgrade():
+    op.execute('ALTER TABLE security_logs RENAME TO security_logs_partitioned')
+    op.execute('ALTER TABLE security_logs_partitioned RENAME CONSTRAINT security_logs_pkey TO security_logs_partitioned_pkey')
+    op.execute('ALTER INDEX idx_security_logs_event_type RENAME TO idx_security_logs_partitioned_event_type')
+    op.execute('ALTER INDEX idx_security_logs_timestamp RENAME TO idx_security_logs_partitioned_timestamp')
+    op.execute('ALTER INDEX idx_security_logs_client_ip RENAME TO idx_security_logs_partitioned_client_ip')
+
+    op.execute('''
+        CREATE TABLE security_logs (
+            id UUID NOT NULL,
+            event_type VARCHAR(50) NOT NULL,
+            "timestamp" TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            client_ip INET,
+            details JSONB,
+            severity VARCHAR(20),
+            CONSTRAINT security_logs_pkey PRIMARY KEY (id)
+        )
+    ''')
+    op.execute('''
+        INSERT INTO security_logs (id, event_type, "timestamp", client_ip, details, severity)
+        SELECT id, event_type, "timestamp", client_ip, details, severity
+        FROM security_logs_partitioned
+    ''')
+    # Dropping the parent drops every partition with it
+    op.execute('DROP TABLE security_logs_partitioned')
+
+    op.create_index('idx_security_logs_event_type', 'security_logs', ['event_type'])
+    op.create_index('idx_security_logs_timestamp', 'security_logs', ['timestamp'])
+    op.create_index('idx_security_logs_client_ip', 'security_logs', ['client_ip'])
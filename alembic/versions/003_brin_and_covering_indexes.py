@@ -0,0 +1,69 @@
+"""BRIN and covering indexes for append-only tables
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 10:00:00.000000
+
+- security_logs.timestamp: B-tree -> BRIN. Rows arrive in time order, so a
+  few hundred bytes of block ranges replace a tree that every insert has to
+  maintain. BRIN cannot feed ORDER BY, so the newest-first keyset pages
+  (search, export) get their own (timestamp, id) B-tree - the primary key
+  leads with id and cannot serve them.
+- security_logs.event_type: widened to (event_type, timestamp) INCLUDE
+  (severity) so per-type time-range counts are index-only scans.
+- contact_submissions: single-column status/submitted_at indexes become
+  (status, submitted_at, id) and (submitted_at, id), which serve keyset
+  pagination in both directions. submitted_at stays a B-tree because
+  ordered "newest first" listings need it; BRIN cannot feed ORDER BY.
+- sessions: idx_sessions_session_id duplicated the UNIQUE constraint's
+  index and is dropped.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # security_logs (partitioned - indexes cascade to every partition)
+    op.drop_index('idx_security_logs_timestamp', table_name='security_logs')
+    op.create_index(
+        'idx_security_logs_timestamp_brin', 'security_logs', ['timestamp'],
+        postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+    )
+    op.create_index('idx_security_logs_timestamp_id', 'security_logs', ['timestamp', 'id'])
+    op.drop_index('idx_security_logs_event_type', table_name='security_logs')
+    op.create_index(
+        'idx_security_logs_event_type_timestamp', 'security_logs', ['event_type', 'timestamp'],
+        postgresql_include=['severity']
+    )
+
+    # contact_submissions
+    op.drop_index('idx_contact_submissions_submitted_at', table_name='contact_submissions')
+    op.create_index('idx_contact_submissions_submitted_at_id', 'contact_submissions', ['submitted_at', 'id'])
+    op.drop_index('idx_contact_submissions_status', table_name='contact_submissions')
+    op.create_index(
+        'idx_contact_submissions_status_submitted_at', 'contact_submissions', ['status', 'submitted_at', 'id']
+    )
+
+    # sessions - UNIQUE(session_id) already provides this index
+    op.drop_index('idx_sessions_session_id', table_name='sessions')
+
+
+def downgrade():
+    op.create_index('idx_sessions_session_id', 'sessions', ['session_id'])
+
+    op.drop_index('idx_contact_submissions_status_submitted_at', table_name='contact_submissions')
+    op.create_index('idx_contact_submissions_status', 'contact_submissions', ['status'])
+    op.drop_index('idx_contact_submissions_submitted_at_id', table_name='contact_submissions')
+    op.create_index('idx_contact_submissions_submitted_at', 'contact_submissions', ['submitted_at'])
+
+    op.drop_index('idx_security_logs_event_type_timestamp', table_name='security_logs')
+    op.create_index('idx_security_logs_event_type', 'security_logs', ['event_type'])
+    op.drop_index('idx_security_logs_timestamp_id', table_name='security_logs')
+    op.drop_index('idx_security_logs_timestamp_brin', table_name='security_logs')
+    op.create_index('idx_security_logs_timestamp', 'security_logs', ['timestamp'])
@@ -0,0 +1,42 @@
+"""Full-text search over contact submission messages
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 11:00:00.000000
+
+Adds a stored generated tsvector over contact_submissions.message with a GIN
+index, so word searches use the index instead of an ILIKE sequential scan.
+Being generated, the column stays correct for every insert path (helpers,
+fast path, COPY ingest) without application changes.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'contact_submissions',
+        sa.Column(
+            'message_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', coalesce(message, ''))", persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index(
+        'idx_contact_submissions_message_tsv', 'contact_submissions', ['message_tsv'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('idx_contact_submissions_message_tsv', table_name='contact_submissions')
+    op.drop_column('contact_submissions', 'message_tsv')
@@ -0,0 +1,29 @@
+"""GIN index on security_logs.details for containment lookups
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 12:00:00.000000
+
+jsonb_path_ops only supports @> containment, which is every lookup we make
+(fingerprint, submission_id, ...), and is a fraction of the size of the
+default jsonb_ops GIN index.
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_security_logs_details_path', 'security_logs', ['details'],
+        postgresql_using='gin', postgresql_ops={'details': 'jsonb_path_ops'}
+    )
+
+
+def downgrade():
+    op.drop_index('idx_security_logs_details_path', table_name='security_logs')
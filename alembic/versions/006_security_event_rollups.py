@@ -0,0 +1,33 @@
+"""Per-minute security event rollups
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 13:00:00.000000
+
+Counts per (minute, event_type, severity), maintained incrementally by the
+application's security-log writer with additive upserts, so dashboards read
+rollup rows instead of aggregating raw security_logs.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('security_event_rollups',
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('event_count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'event_type', 'severity')
+    )
+
+
+def downgrade():
+    op.drop_table('security_event_rollups')
@@ -0,0 +1,31 @@
+"""Idempotency key on contact_submissions
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 14:00:00.000000
+
+Nullable so existing rows need no backfill (NULLs never conflict). The
+unique index is the durable backstop behind the app's in-memory recent-key
+cache: a retried submission upserts onto the original row and gets its id.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('contact_submissions', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_index(
+        'idx_contact_submissions_idempotency_key', 'contact_submissions', ['idempotency_key'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('idx_contact_submissions_idempotency_key', table_name='contact_submissions')
+    op.drop_column('contact_submissions', 'idempotency_key')
@@ -4,18 +4,59 @@ Migrated from MongoDB to PostgreSQL with JSONB support
 """
 
 import os
+import json
+import base64
+import time
 import uuid
-from datetime import datetime
-from typing import Optional, Dict, Any
+import random
+import asyncio
+import ipaddress
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone, date, timedelta
+from typing import (
+    Optional, Dict, Any, List, Tuple, Callable, Awaitable, Iterable, AsyncIterable,
+    AsyncIterator, Union
+)
+
+import asyncpg
 
-import databases
 import sqlalchemy
 from sqlalchemy import (
-    Column, String, Text, DateTime, JSON, Integer, 
+    Column, String, Text, DateTime, JSON, Integer, BigInteger,
     create_engine, MetaData, Table
 )
-from sqlalchemy.dialects.postgresql import JSONB, INET, UUID
+from sqlalchemy.dialects.postgresql import JSONB, INET, UUID, TSVECTOR, insert as pg_insert
 from sqlalchemy.sql import func
+from instrumentation import InstrumentedDatabase, rows_from_status
+
+# PERFORMANCE: Time-ordered UUIDv7 keys (RFC 9562) keep primary-key inserts on the
+# right-most B-tree pages instead of scattering them like random uuid4 values
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+def uuid7() -> uuid.UUID:
+    """48-bit Unix ms timestamp, 12-bit monotonic counter, 62 random bits"""
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _uuid7_last_ms:
+            _uuid7_last_ms = timestamp_ms
+            # Random start in the lower half leaves headroom for same-ms increments
+            _uuid7_counter = random.getrandbits(11)
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # Counter exhausted within this millisecond: borrow the next one
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        timestamp_ms = _uuid7_last_ms
+        counter = _uuid7_counter
+    
+    rand_b = int.from_bytes(os.urandom(8), 'big') & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=(timestamp_ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b)
 
 # Database configuration for Render PostgreSQL
 def get_database_url():
@@ -38,41 +79,99 @@ def get_database_url():
 
 DATABASE_URL = get_database_url()
 
+# PERFORMANCE: Pool sized up front (min_size connections open at startup) and
+# RESILIENCE: server-side limits on every pooled connection, so a runaway query
+# or a transaction left idle cannot pin a connection indefinitely
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_MAX_INACTIVE_LIFETIME = float(os.environ.get('DB_POOL_MAX_INACTIVE_LIFETIME', '300'))  # seconds
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '15000'))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.environ.get('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', '10000'))
+DB_APPLICATION_NAME = os.environ.get('DB_APPLICATION_NAME', 'copperhead-backend')
+DB_POOL_WARMUP = os.environ.get('DB_POOL_WARMUP', 'true').lower() == 'true'
+# Streaming exports sit idle in their cursor's transaction while slow clients read
+DB_EXPORT_IDLE_TIMEOUT_MS = int(os.environ.get('DB_EXPORT_IDLE_TIMEOUT_MS', '300000'))
+
+pool_warmup_stats = {"connections": 0, "statements": 0, "failed": 0}
+
+async def warm_statement_cache(connection) -> None:
+    """asyncpg pool init hook: cache the fast-path statements on each new connection
+
+    Uses the same statement cache that fetchval()/execute() consult (keyed by
+    the SQL text), so the first fast-path call on a connection skips the
+    Parse/Describe round trip. Connection.prepare() would not help: it always
+    bypasses that cache. Runs for connections opened later under load or
+    after max_inactive_connection_lifetime too, not just the min_size ones.
+    """
+    for sql in FAST_PATH_SQL.values():
+        try:
+            await connection._get_statement(sql, DB_CALL_TIMEOUT)
+            pool_warmup_stats["statements"] += 1
+        except Exception as e:
+            # Usually a schema that is behind - the real call will report it properly
+            pool_warmup_stats["failed"] += 1
+            print(f"⚠️ Statement cache warm-up skipped a fast-path statement: {e}")
+    pool_warmup_stats["connections"] += 1
+
+def get_pool_options() -> Dict[str, Any]:
+    """asyncpg.create_pool keyword arguments (passed through by databases)"""
+    options = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': max(DB_POOL_MAX_SIZE, DB_POOL_MIN_SIZE),
+        'max_inactive_connection_lifetime': DB_POOL_MAX_INACTIVE_LIFETIME,
+        'server_settings': {
+            'application_name': DB_APPLICATION_NAME,
+            'statement_timeout': str(DB_STATEMENT_TIMEOUT_MS),
+            'idle_in_transaction_session_timeout': str(DB_IDLE_IN_TRANSACTION_TIMEOUT_MS),
+        },
+    }
+    if DB_POOL_WARMUP:
+        options['init'] = warm_statement_cache
+    return options
+
 # Create database instance
-database = databases.Database(DATABASE_URL)
+# PERFORMANCE: Every statement is timed per name; slow ones are logged (see instrumentation.py)
+database = InstrumentedDatabase(DATABASE_URL, **get_pool_options())
 metadata = MetaData()
 
 # Contact submissions table (migrated from MongoDB)
 contact_submissions = Table(
     'contact_submissions',
     metadata,
-    Column('id', UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column('id', UUID(as_uuid=True), primary_key=True, default=uuid7),
     Column('name', String(100), nullable=False),
     Column('email', String(255), nullable=False),
     Column('message', Text, nullable=False),
     Column('submitted_at', DateTime(timezone=True), server_default=func.now()),
     Column('client_fingerprint', String(32)),
     Column('status', String(20), default='new'),
-    Column('metadata', JSONB, nullable=True)  # For additional flexible data
+    Column('metadata', JSONB, nullable=True),  # For additional flexible data
+    # Client retry de-duplication (migration 007)
+    Column('idempotency_key', String(64), nullable=True, unique=True),
+    # Full-text search vector maintained by PostgreSQL (migration 004)
+    Column('message_tsv', TSVECTOR, sqlalchemy.Computed(
+        "to_tsvector('english', coalesce(message, ''))", persisted=True
+    ))
 )
 
-# Security logs table (migrated from MongoDB)
+# Security logs table (migrated from MongoDB), range-partitioned by day (migration 002)
 security_logs = Table(
     'security_logs',
     metadata,
-    Column('id', UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column('id', UUID(as_uuid=True), primary_key=True, default=uuid7),
     Column('event_type', String(50), nullable=False),
-    Column('timestamp', DateTime(timezone=True), server_default=func.now()),
+    Column('timestamp', DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now()),
     Column('client_ip', INET, nullable=True),
     Column('details', JSONB, nullable=True),
-    Column('severity', String(20), default='medium')
+    Column('severity', String(20), default='medium'),
+    postgresql_partition_by='RANGE ("timestamp")'
 )
 
 # Sessions table (migrated from MongoDB)
 sessions = Table(
     'sessions',
     metadata,
-    Column('id', UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column('id', UUID(as_uuid=True), primary_key=True, default=uuid7),
     Column('session_id', String(64), unique=True, nullable=False),
     Column('client_fingerprint', String(32), nullable=False),
     Column('created_at', DateTime(timezone=True), server_default=func.now()),
@@ -81,14 +180,45 @@ sessions = Table(
     Column('data', JSONB, nullable=True)  # For session data
 )
 
-# Create engine for migrations
-engine = create_engine(DATABASE_URL)
+# Per-minute security event counts (migration 006)
+security_event_rollups = Table(
+    'security_event_rollups',
+    metadata,
+    Column('bucket', DateTime(timezone=True), primary_key=True),
+    Column('event_type', String(50), primary_key=True),
+    Column('severity', String(20), primary_key=True),
+    Column('event_count', BigInteger, nullable=False, server_default='0')
+)
+
+# PERFORMANCE: Schema management stays out of the serving path by default.
+# Migrations run via `alembic upgrade head`; set DB_CREATE_TABLES=true only for
+# throwaway environments without Alembic.
+DB_CREATE_TABLES = os.environ.get('DB_CREATE_TABLES', 'false').lower() == 'true'
+ALEMBIC_SCRIPT_LOCATION = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic')
+
+_engine = None
+
+def get_engine():
+    """Synchronous (psycopg2) engine, created on first use only"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL)
+    return _engine
+
+def get_schema_head() -> Optional[str]:
+    """Head revision of the bundled Alembic migrations, if they are present"""
+    if not os.path.isdir(ALEMBIC_SCRIPT_LOCATION):
+        return None
+    from alembic.script import ScriptDirectory
+    heads = ScriptDirectory(ALEMBIC_SCRIPT_LOCATION).get_heads()
+    return heads[0] if len(heads) == 1 else None
 
 # Database connection management
 class DatabaseManager:
     def __init__(self):
         self.database = database
         self.is_connected = False
+        self._ping_connection = None
     
     async def connect(self):
         """Connect to PostgreSQL database"""
@@ -101,71 +231,745 @@ class DatabaseManager:
             print(f"❌ PostgreSQL connection failed: {e}")
             raise
     
+    @property
+    def pool(self):
+        """The live asyncpg pool (None while disconnected)"""
+        pool = getattr(self.database._backend, '_pool', None)
+        return getattr(pool, '_pool', pool)  # unwrap the instrumentation proxy
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool snapshot for health output"""
+        pool = self.pool
+        if pool is None:
+            return {"open": False}
+        size = pool.get_size()
+        idle = pool.get_idle_size()
+        return {
+            "open": True,
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": self.database.pool_waiting,
+            "min_size": pool.get_min_size(),
+            "max_size": pool.get_max_size(),
+            "warmup": pool_warmup_stats
+        }
+    
+    async def ping(self, timeout: float) -> bool:
+        """Cheap liveness probe used by the connection supervisor
+
+        Runs on a dedicated connection outside the pool: a pool saturated by
+        slow requests would make an acquire time out while the server is fine.
+        """
+        try:
+            await asyncio.wait_for(self._ping(), timeout=timeout)
+            return True
+        except Exception:
+            self._drop_ping_connection()
+            return False
+    
+    async def _ping(self):
+        if self._ping_connection is None or self._ping_connection.is_closed():
+            self._ping_connection = await asyncpg.connect(
+                DATABASE_URL, server_settings={'application_name': f"{DB_APPLICATION_NAME}-health"}
+            )
+        await self._ping_connection.fetchval("SELECT 1")
+    
+    def _drop_ping_connection(self):
+        if self._ping_connection is not None:
+            self._ping_connection.terminate()
+            self._ping_connection = None
+    
     async def disconnect(self):
         """Disconnect from PostgreSQL database"""
+        self._drop_ping_connection()
         if self.is_connected:
             await self.database.disconnect()
             self.is_connected = False
             print("✅ PostgreSQL database disconnected")
     
     async def create_tables(self):
-        """Create all tables if they don't exist"""
+        """Create all tables if they don't exist (blocking DDL runs off the event loop)"""
         try:
-            metadata.create_all(engine)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, lambda: metadata.create_all(get_engine()))
             print("✅ PostgreSQL tables created successfully")
         except Exception as e:
             print(f"❌ Failed to create tables: {e}")
             raise
+    
+    async def check_schema(self) -> str:
+        """Compare alembic_version with the bundled head using the async driver
+
+        Returns "at_head", "behind", "unversioned" or "unknown". Never runs DDL
+        unless DB_CREATE_TABLES is set.
+        """
+        if DB_CREATE_TABLES:
+            await self.create_tables()
+            return "created"
+        
+        loop = asyncio.get_running_loop()
+        head = await loop.run_in_executor(None, get_schema_head)
+        try:
+            current = await self.database.fetch_val("SELECT version_num FROM alembic_version")
+        except asyncpg.exceptions.UndefinedTableError:
+            print("⚠️ PostgreSQL schema is not managed by Alembic - run `alembic upgrade head`")
+            return "unversioned"
+        
+        if head is None:
+            return "unknown"
+        if current != head:
+            print(f"⚠️ PostgreSQL schema at {current}, expected {head} - run `alembic upgrade head`")
+            return "behind"
+        return "at_head"
 
 # Global database manager instance
 db_manager = DatabaseManager()
 
+# RESILIENCE: Circuit breaker, per-call deadline and retry budget for DB calls
+DB_CALL_TIMEOUT = float(os.environ.get('DB_CALL_TIMEOUT', '5.0'))  # seconds per attempt
+DB_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('DB_BREAKER_FAILURE_THRESHOLD', '5'))
+DB_BREAKER_RESET_TIMEOUT = float(os.environ.get('DB_BREAKER_RESET_TIMEOUT', '30'))  # seconds open
+DB_MAX_RETRIES = int(os.environ.get('DB_MAX_RETRIES', '2'))
+DB_RETRY_BASE_DELAY = float(os.environ.get('DB_RETRY_BASE_DELAY', '0.05'))  # seconds
+DB_RETRY_BUDGET_RATIO = float(os.environ.get('DB_RETRY_BUDGET_RATIO', '0.2'))  # retries per success
+
+# Failures that mean "the database is unhealthy" rather than "this query is wrong"
+RETRYABLE_DB_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    OSError,
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.InterfaceError,
+    asyncpg.exceptions.TooManyConnectionsError,
+    asyncpg.exceptions.CannotConnectNowError,
+)
+
+class DatabaseUnavailable(Exception):
+    """Raised without touching the database while the circuit breaker is open"""
+
+class DatabaseCircuitBreaker:
+    """Closed/open/half-open breaker with a token-based retry budget"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float, call_timeout: float,
+                 max_retries: int, retry_base_delay: float, retry_budget_ratio: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.call_timeout = call_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_budget_ratio = retry_budget_ratio
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        # Retries are only spent while the budget has tokens; successes refill it
+        self.retry_tokens = 10.0
+        self.max_retry_tokens = 10.0
+        self.rejected = 0
+        self.timeouts = 0
+    
+    def _allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            # Exactly one probe decides whether the breaker closes again
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+        return True
+    
+    def _record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.retry_tokens = min(self.max_retry_tokens, self.retry_tokens + self.retry_budget_ratio)
+    
+    def _record_failure(self):
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"❌ Database circuit breaker opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[Callable[[], None]]:
+        """Gate an operation call() cannot wrap, such as a stream that outlives any deadline
+
+        Raises DatabaseUnavailable while open. The yielded callback records
+        success as soon as the operation has proven the database healthy (a
+        stream's first row); finishing cleanly counts too. Retryable errors
+        record a failure; any other exit just releases a half-open probe.
+        """
+        if not self._allow_request():
+            self.rejected += 1
+            raise DatabaseUnavailable("Database circuit breaker is open")
+        succeeded = False
+        
+        def record_success():
+            nonlocal succeeded
+            if not succeeded:
+                succeeded = True
+                self._record_success()
+        
+        try:
+            yield record_success
+        except RETRYABLE_DB_ERRORS as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+            self._record_failure()
+            raise
+        else:
+            record_success()
+        finally:
+            if not succeeded:
+                self.probe_in_flight = False
+    
+    async def call(self, operation: Callable[[], Awaitable[Any]], timeout: Optional[float] = None,
+                   max_retries: Optional[int] = None) -> Any:
+        """Run operation with a deadline per attempt and jittered retries"""
+        timeout = self.call_timeout if timeout is None else timeout
+        max_retries = self.max_retries if max_retries is None else max_retries
+        if not self._allow_request():
+            self.rejected += 1
+            raise DatabaseUnavailable("Database circuit breaker is open")
+        
+        attempt = 0
+        while True:
+            try:
+                result = await asyncio.wait_for(operation(), timeout=timeout)
+            except RETRYABLE_DB_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                retry_allowed = (
+                    self.state == self.CLOSED
+                    and attempt < max_retries
+                    and self.retry_tokens >= 1
+                )
+                if not retry_allowed:
+                    self._record_failure()
+                    raise
+                self.retry_tokens -= 1
+                attempt += 1
+                # Full jitter keeps retries from synchronising across requests
+                await asyncio.sleep(random.uniform(0, self.retry_base_delay * (2 ** attempt)))
+            except asyncio.CancelledError:
+                self.probe_in_flight = False
+                raise
+            except Exception:
+                # Query-level errors (constraint violations etc.) say nothing about DB health
+                self.probe_in_flight = False
+                raise
+            else:
+                self._record_success()
+                return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Breaker snapshot for health output"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_tokens": round(self.retry_tokens, 2),
+            "rejected": self.rejected,
+            "timeouts": self.timeouts
+        }
+
+db_breaker = DatabaseCircuitBreaker(
+    failure_threshold=DB_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=DB_BREAKER_RESET_TIMEOUT,
+    call_timeout=DB_CALL_TIMEOUT,
+    max_retries=DB_MAX_RETRIES,
+    retry_base_delay=DB_RETRY_BASE_DELAY,
+    retry_budget_ratio=DB_RETRY_BUDGET_RATIO,
+)
+
+# PERFORMANCE: Security event rollups are counted in-process and flushed as
+# additive upserts, so a burst of identical events costs one row update per
+# minute bucket instead of one contended UPDATE per event.
+# Failures raised before a statement reaches the server - it certainly did not run
+DB_NOT_SENT_ERRORS = (
+    DatabaseUnavailable,
+    ConnectionRefusedError,
+    asyncpg.exceptions.TooManyConnectionsError,
+    asyncpg.exceptions.CannotConnectNowError,
+)
+
+class SecurityEventRollup:
+    """Per-(minute, event_type, severity) counters awaiting flush"""
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self.flushed_rows = 0
+        self.dropped_events = 0
+        self.unknown_events = 0
+    
+    def record(self, timestamp: datetime, event_type: str, severity: str, count: int = 1):
+        bucket = timestamp.replace(second=0, microsecond=0)
+        self._counts[(bucket, event_type, severity or 'medium')] += count
+    
+    @property
+    def pending(self) -> int:
+        return len(self._counts)
+    
+    async def flush(self) -> int:
+        """Upsert pending counts, returning the number of rollup rows touched"""
+        if not self._counts:
+            return 0
+        # Swap before awaiting so events recorded during the flush land in the next batch
+        pending, self._counts = self._counts, Counter()
+        rows = [
+            {'bucket': bucket, 'event_type': event_type, 'severity': severity, 'event_count': count}
+            for (bucket, event_type, severity), count in pending.items()
+        ]
+        statement = pg_insert(security_event_rollups).values(rows)
+        query = statement.on_conflict_do_update(
+            index_elements=['bucket', 'event_type', 'severity'],
+            set_={'event_count': security_event_rollups.c.event_count + statement.excluded.event_count}
+        )
+        try:
+            # Increments are not idempotent: a retry after a commit whose reply was lost counts twice
+            await db_breaker.call(lambda: database.execute(query), max_retries=0)
+        except DB_NOT_SENT_ERRORS:
+            # Never reached the database - keep the counts for the next flush
+            self._counts.update(pending)
+            raise
+        except RETRYABLE_DB_ERRORS:
+            # Timeout or connection lost mid-statement: the upsert may have committed,
+            # so re-adding could double count. Reported instead of guessed.
+            self.unknown_events += sum(pending.values())
+            raise
+        except Exception:
+            self.dropped_events += sum(pending.values())
+            raise
+        self.flushed_rows += len(rows)
+        return len(rows)
+
+security_event_rollup = SecurityEventRollup()
+
+# PERFORMANCE: Fast path for hot inserts - fixed SQL text with positional args goes
+# straight to asyncpg, whose per-connection statement cache prepares each statement
+# once per pooled connection. Skips SQLAlchemy compilation on every call.
+DB_FAST_PATH = os.environ.get('DB_FAST_PATH', 'true').lower() == 'true'
+
+FAST_PATH_SQL = {
+    # A replayed idempotency key touches the original row and returns its id
+    'insert_contact_submission': (
+        "INSERT INTO contact_submissions "
+        "(id, name, email, message, client_fingerprint, status, metadata, idempotency_key) "
+        "VALUES ($1, $2, $3, $4, $5, $6, $7, $8) "
+        "ON CONFLICT (idempotency_key) DO UPDATE SET idempotency_key = EXCLUDED.idempotency_key "
+        "RETURNING id"
+    ),
+    # Breaker retries resend the same key, so an attempt that committed before
+    # its reply was lost turns the retry into a no-op instead of a key violation
+    'insert_security_log': (
+        "INSERT INTO security_logs (id, event_type, timestamp, client_ip, details, severity) "
+        "VALUES ($1, $2, $3, $4, $5, $6) "
+        "ON CONFLICT (id, timestamp) DO NOTHING"
+    ),
+    'insert_session': (
+        "INSERT INTO sessions (id, session_id, client_fingerprint, csrf_token, data) "
+        "VALUES ($1, $2, $3, $4, $5) "
+        "ON CONFLICT (id) DO NOTHING"
+    ),
+    # Same insert as one implicit transaction whose commit skips the WAL flush wait:
+    # set_config(..., true) is transaction-local, so it covers exactly this statement
+    'insert_security_log_async_commit': (
+        "INSERT INTO security_logs (id, event_type, timestamp, client_ip, details, severity) "
+        "SELECT $1::uuid, $2::varchar, $3::timestamptz, $4::inet, $5::jsonb, $6::varchar "
+        "FROM (SELECT set_config('synchronous_commit', 'off', true)) AS async_commit "
+        "ON CONFLICT (id, timestamp) DO NOTHING"
+    ),
+}
+
+# PERFORMANCE: Durability tiers. An 'async' commit returns before its WAL
+# record is flushed (synchronous_commit = off): a crash can lose the last few
+# hundred milliseconds of such commits, but never corrupts or half-applies
+# them. High-volume audit rows take that trade; contact leads never do.
+DURABILITY_DURABLE = 'durable'
+DURABILITY_ASYNC = 'async'
+TABLE_DURABILITY = {
+    'contact_submissions': DURABILITY_DURABLE,
+    'security_logs': os.environ.get('DB_SECURITY_LOG_DURABILITY', DURABILITY_ASYNC),
+    'sessions': DURABILITY_DURABLE,
+}
+
+def _async_commit(table_name: str, durability: Optional[str] = None) -> bool:
+    return (durability or TABLE_DURABILITY.get(table_name, DURABILITY_DURABLE)) == DURABILITY_ASYNC
+
+async def _execute_async_commit(query) -> Any:
+    """Run one statement in a transaction that commits without waiting for the WAL flush"""
+    async with database.transaction():
+        await database.execute("SET LOCAL synchronous_commit = off")
+        return await database.execute(query)
+
+def _jsonb_arg(value: Optional[Dict[str, Any]]) -> Optional[str]:
+    """asyncpg expects JSONB parameters as text"""
+    return None if value is None else json.dumps(value, default=str)
+
+def _inet_arg(value: Optional[str]) -> Optional[str]:
+    """Map non-IP client identifiers (e.g. 'unknown') to NULL instead of failing the insert"""
+    if not value:
+        return None
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return None
+    return value
+
+async def _fast_fetchval(sql_name: str, *args) -> Any:
+    """Run a FAST_PATH_SQL statement and return the first column of its first row"""
+    async with database.observe(sql_name, FAST_PATH_SQL[sql_name]) as result:
+        async with database.connection() as connection:
+            value = await connection.raw_connection.fetchval(FAST_PATH_SQL[sql_name], *args)
+        result["rows"] = 0 if value is None else 1
+        return value
+
+async def _fast_execute(sql_name: str, *args) -> str:
+    """Execute a FAST_PATH_SQL statement on a pooled asyncpg connection"""
+    async with database.observe(sql_name, FAST_PATH_SQL[sql_name]) as result:
+        async with database.connection() as connection:
+            status = await connection.raw_connection.execute(FAST_PATH_SQL[sql_name], *args)
+        result["rows"] = rows_from_status(status)
+        return status
+
 # Helper functions for database operations
 async def insert_contact_submission(data: Dict[str, Any]) -> str:
-    """Insert contact submission into PostgreSQL"""
-    submission_id = str(uuid.uuid4())
-    query = contact_submissions.insert().values(
+    """Insert contact submission into PostgreSQL
+
+    With an idempotency_key that already exists, no new row is created and
+    the original submission's id is returned.
+    """
+    submission_id = uuid7()
+    # Without a key a retried insert cannot tell its own committed row from a new one
+    max_retries = None if data.get('idempotency_key') else 0
+    if DB_FAST_PATH:
+        stored_id = await db_breaker.call(lambda: _fast_fetchval(
+            'insert_contact_submission',
+            submission_id,
+            data['name'],
+            data['email'],
+            data['message'],
+            data.get('client_fingerprint'),
+            data.get('status', 'new'),
+            _jsonb_arg(data.get('metadata')),
+            data.get('idempotency_key')
+        ), max_retries=max_retries)
+        return str(stored_id)
+    
+    statement = pg_insert(contact_submissions).values(
         id=submission_id,
         name=data['name'],
         email=data['email'],
         message=data['message'],
         client_fingerprint=data.get('client_fingerprint'),
         status=data.get('status', 'new'),
-        metadata=data.get('metadata')
+        metadata=data.get('metadata'),
+        idempotency_key=data.get('idempotency_key')
     )
-    await database.execute(query)
-    return submission_id
+    query = statement.on_conflict_do_update(
+        index_elements=['idempotency_key'],
+        set_={'idempotency_key': statement.excluded.idempotency_key}
+    ).returning(contact_submissions.c.id)
+    stored_id = await db_breaker.call(lambda: database.execute(query), max_retries=max_retries)
+    return str(stored_id)
+
+async def insert_security_log(event_type: str, client_ip: str, details: Dict[str, Any], severity: str = 'medium',
+                              durability: Optional[str] = None) -> str:
+    """Insert security log into PostgreSQL
 
-async def insert_security_log(event_type: str, client_ip: str, details: Dict[str, Any], severity: str = 'medium') -> str:
-    """Insert security log into PostgreSQL"""
-    log_id = str(uuid.uuid4())
-    query = security_logs.insert().values(
+    durability overrides the table's tier for this call ('durable' or 'async').
+    """
+    log_id = uuid7()
+    # Stamped here rather than by the column default, so the row and its rollup bucket agree
+    timestamp = datetime.now(timezone.utc)
+    async_commit = _async_commit('security_logs', durability)
+    if DB_FAST_PATH:
+        await db_breaker.call(lambda: _fast_execute(
+            'insert_security_log_async_commit' if async_commit else 'insert_security_log',
+            log_id,
+            event_type,
+            timestamp,
+            _inet_arg(client_ip),
+            _jsonb_arg(details),
+            severity
+        ))
+        security_event_rollup.record(timestamp, event_type, severity)
+        return str(log_id)
+    
+    query = pg_insert(security_logs).values(
         id=log_id,
         event_type=event_type,
-        client_ip=client_ip,
+        timestamp=timestamp,
+        client_ip=_inet_arg(client_ip),
         details=details,
         severity=severity
-    )
-    await database.execute(query)
-    return log_id
+    ).on_conflict_do_nothing(index_elements=['id', 'timestamp'])
+    if async_commit:
+        await db_breaker.call(lambda: _execute_async_commit(query))
+    else:
+        await db_breaker.call(lambda: database.execute(query))
+    security_event_rollup.record(timestamp, event_type, severity)
+    return str(log_id)
 
 async def insert_session(session_id: str, client_fingerprint: str, csrf_token: str, data: Optional[Dict[str, Any]] = None) -> str:
     """Insert session into PostgreSQL"""
-    session_uuid = str(uuid.uuid4())
-    query = sessions.insert().values(
+    session_uuid = uuid7()
+    if DB_FAST_PATH:
+        await db_breaker.call(lambda: _fast_execute(
+            'insert_session',
+            session_uuid,
+            session_id,
+            client_fingerprint,
+            csrf_token,
+            _jsonb_arg(data)
+        ))
+        return str(session_uuid)
+    
+    query = pg_insert(sessions).values(
         id=session_uuid,
         session_id=session_id,
         client_fingerprint=client_fingerprint,
         csrf_token=csrf_token,
         data=data
+    ).on_conflict_do_nothing(index_elements=['id'])
+    await db_breaker.call(lambda: database.execute(query))
+    return str(session_uuid)
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive datetimes are taken as UTC; aware ones are converted to it"""
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+# PERFORMANCE: Keyset (cursor) pagination - page cost is independent of depth
+CONTACT_SUBMISSION_LIST_COLUMNS = [
+    contact_submissions.c.id,
+    contact_submissions.c.name,
+    contact_submissions.c.email,
+    contact_submissions.c.message,
+    contact_submissions.c.submitted_at,
+    contact_submissions.c.status,
+    contact_submissions.c.metadata,
+]
+
+def encode_keyset_cursor(timestamp: datetime, row_id: Any) -> str:
+    """Opaque cursor for the last row of a page"""
+    raw = json.dumps([timestamp.isoformat(), str(row_id)], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_keyset_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of encode_keyset_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), uuid.UUID(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+async def list_contact_submissions(limit: int = 50,
+                                   cursor: Optional[str] = None,
+                                   status: Optional[str] = None,
+                                   email: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Newest-first page of contact submissions plus the cursor for the next page
+
+    Seeks on (submitted_at, id) < cursor instead of OFFSET, served by
+    idx_contact_submissions_submitted_at_id / idx_contact_submissions_status_submitted_at.
+    """
+    query = sqlalchemy.select(*CONTACT_SUBMISSION_LIST_COLUMNS)
+    if status is not None:
+        query = query.where(contact_submissions.c.status == status)
+    if email is not None:
+        query = query.where(contact_submissions.c.email == email)
+    if cursor is not None:
+        after_timestamp, after_id = decode_keyset_cursor(cursor)
+        query = query.where(
+            sqlalchemy.tuple_(contact_submissions.c.submitted_at, contact_submissions.c.id)
+            < sqlalchemy.tuple_(after_timestamp, after_id)
+        )
+    # Fetch one extra row to learn whether another page exists
+    query = query.order_by(
+        contact_submissions.c.submitted_at.desc(), contact_submissions.c.id.desc()
+    ).limit(limit + 1)
+    
+    rows = await db_breaker.call(lambda: database.fetch_all(query))
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_keyset_cursor(last['submitted_at'], last['id'])
+    return items, next_cursor
+
+# PERFORMANCE: Security log search - details containment uses the jsonb_path_ops
+# GIN index, time bounds prune partitions, pages seek on (timestamp, id)
+SECURITY_LOG_LIST_COLUMNS = [
+    security_logs.c.id,
+    security_logs.c.event_type,
+    security_logs.c.timestamp,
+    security_logs.c.client_ip,
+    security_logs.c.details,
+    security_logs.c.severity,
+]
+
+async def search_security_logs(limit: int = 100,
+                               cursor: Optional[str] = None,
+                               event_type: Optional[str] = None,
+                               severity: Optional[str] = None,
+                               since: Optional[datetime] = None,
+                               until: Optional[datetime] = None,
+                               network: Optional[str] = None,
+                               details: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Newest-first page of security events matching every given filter
+
+    network is an IP address or CIDR block (client_ip <<= network); details is
+    a JSON object the event's details must contain (details @> details).
+    """
+    since, until = as_utc(since), as_utc(until)
+    query = sqlalchemy.select(*SECURITY_LOG_LIST_COLUMNS)
+    if event_type is not None:
+        query = query.where(security_logs.c.event_type == event_type)
+    if severity is not None:
+        query = query.where(security_logs.c.severity == severity)
+    if since is not None:
+        query = query.where(security_logs.c.timestamp >= since)
+    if until is not None:
+        query = query.where(security_logs.c.timestamp < until)
+    if network is not None:
+        query = query.where(security_logs.c.client_ip.op('<<=')(sqlalchemy.cast(network, INET)))
+    if details is not None:
+        query = query.where(security_logs.c.details.contains(details))
+    if cursor is not None:
+        after_timestamp, after_id = decode_keyset_cursor(cursor)
+        query = query.where(
+            sqlalchemy.tuple_(security_logs.c.timestamp, security_logs.c.id)
+            < sqlalchemy.tuple_(after_timestamp, after_id)
+        )
+    query = query.order_by(security_logs.c.timestamp.desc(), security_logs.c.id.desc()).limit(limit + 1)
+    
+    rows = await db_breaker.call(lambda: database.fetch_all(query))
+    items = []
+    for row in rows[:limit]:
+        item = dict(row)
+        if item['client_ip'] is not None:
+            item['client_ip'] = str(item['client_ip'])
+        items.append(item)
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_keyset_cursor(last['timestamp'], last['id'])
+    return items, next_cursor
+
+ROLLUP_INTERVALS = ('minute', 'hour', 'day')
+
+async def security_event_timeseries(since: datetime, until: datetime, interval: str = 'minute',
+                                    event_type: Optional[str] = None,
+                                    severity: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Event counts per interval from the rollup table (never scans security_logs)"""
+    if interval not in ROLLUP_INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    since, until = as_utc(since), as_utc(until)
+    # Whitelisted above; inlined so SELECT and GROUP BY share one expression
+    bucket = func.date_trunc(
+        sqlalchemy.literal_column(f"'{interval}'"), security_event_rollups.c.bucket
+    ).label('bucket')
+    query = sqlalchemy.select(
+        bucket,
+        security_event_rollups.c.event_type,
+        security_event_rollups.c.severity,
+        sqlalchemy.cast(func.sum(security_event_rollups.c.event_count), BigInteger).label('count')
+    ).where(
+        security_event_rollups.c.bucket >= since,
+        security_event_rollups.c.bucket < until
     )
-    await database.execute(query)
-    return session_uuid
+    if event_type is not None:
+        query = query.where(security_event_rollups.c.event_type == event_type)
+    if severity is not None:
+        query = query.where(security_event_rollups.c.severity == severity)
+    query = query.group_by(
+        bucket, security_event_rollups.c.event_type, security_event_rollups.c.severity
+    ).order_by(bucket)
+    
+    rows = await db_breaker.call(lambda: database.fetch_all(query))
+    return [dict(row) for row in rows]
+
+# PERFORMANCE: Exports stream through a server-side cursor (databases.iterate
+# declares a cursor inside a transaction and prefetches in small batches), so
+# memory stays flat however many rows match.
+EXPORT_TABLES = {
+    'contact_submissions': (CONTACT_SUBMISSION_LIST_COLUMNS, contact_submissions.c.submitted_at),
+    'security_logs': (SECURITY_LOG_LIST_COLUMNS, security_logs.c.timestamp),
+}
+
+def export_columns(table_name: str) -> List[str]:
+    columns, _ = EXPORT_TABLES[table_name]
+    return [column.name for column in columns]
+
+async def iterate_export(table_name: str, since: Optional[datetime] = None,
+                         until: Optional[datetime] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Yield rows oldest-first within [since, until) without buffering the result"""
+    columns, time_column = EXPORT_TABLES[table_name]
+    since, until = as_utc(since), as_utc(until)
+    query = sqlalchemy.select(*columns)
+    if since is not None:
+        query = query.where(time_column >= since)
+    if until is not None:
+        query = query.where(time_column < until)
+    query = query.order_by(time_column, columns[0])
+    
+    # A stream can outlive any per-call deadline, so the breaker gates its start
+    # and the first row counts as the success
+    async with db_breaker.guard() as record_success:
+        async with database.transaction():
+            await database.execute(
+                f"SET LOCAL idle_in_transaction_session_timeout = {DB_EXPORT_IDLE_TIMEOUT_MS}"
+            )
+            async for record in database.iterate(query):
+                record_success()
+                row = dict(record)
+                if row.get('client_ip') is not None:
+                    row['client_ip'] = str(row['client_ip'])
+                yield row
+
+# PERFORMANCE: Ranked full-text search on the GIN-indexed message_tsv column.
+# Snippets are generated for the top-ranked page only - ts_headline re-parses
+# the message text and is the expensive part of the query.
+CONTACT_SEARCH_SQL = """
+    SELECT id, name, email, submitted_at, status, rank,
+           ts_headline('english', message, query,
+                       'MaxFragments=2, MinWords=5, MaxWords=20, StartSel=**, StopSel=**') AS snippet
+    FROM (
+        SELECT id, name, email, message, submitted_at, status, query,
+               ts_rank_cd(message_tsv, query) AS rank
+        FROM contact_submissions, websearch_to_tsquery('english', :q) AS query
+        WHERE message_tsv @@ query {status_filter}
+        ORDER BY rank DESC, submitted_at DESC
+        LIMIT :limit
+    ) AS top_matches
+    ORDER BY rank DESC, submitted_at DESC
+"""
+
+async def search_contact_submissions(search: str, limit: int = 20,
+                                     status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Contact submissions whose message matches a web-style search string, best first"""
+    values: Dict[str, Any] = {'q': search, 'limit': limit}
+    status_filter = ''
+    if status is not None:
+        status_filter = 'AND status = :status'
+        values['status'] = status
+    query = CONTACT_SEARCH_SQL.format(status_filter=status_filter)
+    rows = await db_breaker.call(lambda: database.fetch_all(query=query, values=values))
+    return [dict(row) for row in rows]
 
 async def get_session(session_id: str) -> Optional[Dict[str, Any]]:
     """Get session from PostgreSQL"""
     query = sessions.select().where(sessions.c.session_id == session_id)
-    result = await database.fetch_one(query)
+    result = await db_breaker.call(lambda: database.fetch_one(query))
     return dict(result) if result else None
 
 async def update_session_activity(session_id: str) -> bool:
@@ -175,13 +979,13 @@ async def update_session_activity(session_id: str) -> bool:
     ).values(
         last_activity=func.now()
     )
-    result = await database.execute(query)
+    result = await db_breaker.call(lambda: database.execute(query))
     return result > 0
 
 async def delete_session(session_id: str) -> bool:
     """Delete session from PostgreSQL"""
     query = sessions.delete().where(sessions.c.session_id == session_id)
-    result = await database.execute(query)
+    result = await db_breaker.call(lambda: database.execute(query))
     return result > 0
 
 async def cleanup_expired_sessions(timeout_seconds: int = 1800) -> int:
@@ -190,5 +994,258 @@ async def cleanup_expired_sessions(timeout_seconds: int = 1800) -> int:
     query = sessions.delete().where(
         func.extract('epoch', sessions.c.last_activity) < cutoff_time
     )
-    result = await database.execute(query)
+    result = await db_breaker.call(lambda: database.execute(query))
     return result
+
+# PERFORMANCE: COPY-based bulk ingest for backfills, spool replay and log flushes
+BULK_INGEST_BATCH_SIZE = int(os.environ.get('BULK_INGEST_BATCH_SIZE', '5000'))
+DB_BULK_BATCH_TIMEOUT = float(os.environ.get('DB_BULK_BATCH_TIMEOUT', '30'))  # seconds per COPY batch
+
+def _uuid_value(value: Any) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+def _timestamp_value(value: Any) -> datetime:
+    """COPY bypasses server defaults, so missing timestamps are filled in here"""
+    if value is None:
+        return datetime.now(timezone.utc)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return as_utc(value)
+
+def _inet_value(value: Any):
+    if not value:
+        return None
+    try:
+        return ipaddress.ip_address(value)
+    except ValueError:
+        return None
+
+def _security_log_row(record: Dict[str, Any]) -> Tuple:
+    return (
+        _uuid_value(record.get('id') or uuid7()),
+        record['event_type'],
+        _timestamp_value(record.get('timestamp')),
+        _inet_value(record.get('client_ip')),
+        _jsonb_arg(record.get('details')),
+        record.get('severity', 'medium'),
+    )
+
+def _contact_submission_row(record: Dict[str, Any]) -> Tuple:
+    return (
+        _uuid_value(record.get('id') or uuid7()),
+        record['name'],
+        record['email'],
+        record['message'],
+        _timestamp_value(record.get('submitted_at')),
+        record.get('client_fingerprint'),
+        record.get('status', 'new'),
+        _jsonb_arg(record.get('metadata')),
+        record.get('idempotency_key'),
+    )
+
+BULK_INGEST_TABLES = {
+    'security_logs': (
+        ('id', 'event_type', 'timestamp', 'client_ip', 'details', 'severity'),
+        _security_log_row,
+    ),
+    'contact_submissions': (
+        ('id', 'name', 'email', 'message', 'submitted_at', 'client_fingerprint', 'status', 'metadata',
+         'idempotency_key'),
+        _contact_submission_row,
+    ),
+}
+
+async def _iter_batches(records: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                        batch_size: int):
+    batch = []
+    if hasattr(records, '__aiter__'):
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    else:
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+async def bulk_ingest(table_name: str,
+                      records: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                      batch_size: int = BULK_INGEST_BATCH_SIZE,
+                      skip_existing: bool = False) -> int:
+    """Stream records into security_logs or contact_submissions with binary COPY
+
+    Records are plain dicts shaped like the helper arguments; JSONB values are
+    serialised and client IPs parsed for the INET codec. Each batch commits in
+    its own transaction. With skip_existing, batches are copied into a temp
+    staging table and merged with ON CONFLICT DO NOTHING, making re-ingest of
+    the same ids idempotent (COPY itself cannot skip conflicts).
+
+    Returns the number of records sent.
+    """
+    if table_name not in BULK_INGEST_TABLES:
+        raise ValueError(f"Bulk ingest not supported for table: {table_name}")
+    
+    columns, to_row = BULK_INGEST_TABLES[table_name]
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    staging_table = f"_ingest_{table_name}"
+    sent = 0
+    
+    async def copy_batch(rows: List[Tuple]):
+        async with database.connection() as connection:
+            raw = connection.raw_connection
+            if skip_existing:
+                await raw.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} "
+                    f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                )
+            async with database.observe(f"copy {table_name}") as result, raw.transaction():
+                result["rows"] = len(rows)
+                if _async_commit(table_name):
+                    await raw.execute("SET LOCAL synchronous_commit = off")
+                if skip_existing:
+                    await raw.copy_records_to_table(staging_table, records=rows, columns=columns)
+                    await raw.execute(
+                        f"INSERT INTO {table_name} ({column_list}) "
+                        f"SELECT {column_list} FROM {staging_table} ON CONFLICT DO NOTHING"
+                    )
+                else:
+                    await raw.copy_records_to_table(table_name, records=rows, columns=columns)
+    
+    async for batch in _iter_batches(records, batch_size):
+        rows = [to_row(record) for record in batch]
+        # RESILIENCE: Every batch is gated, timed and recorded by the breaker, so a
+        # failing COPY opens it and a half-open probe admits one batch, not a flood.
+        # No retries - the caller (spool replay, queue consumer) owns the retry.
+        await db_breaker.call(lambda: copy_batch(rows), timeout=DB_BULK_BATCH_TIMEOUT, max_retries=0)
+        if table_name == 'security_logs':
+            # Row layout: (id, event_type, timestamp, client_ip, details, severity)
+            for row in rows:
+                security_event_rollup.record(row[2], row[1], row[5])
+        sent += len(rows)
+    
+    return sent
+
+# RETENTION: Daily security_logs partitions - created ahead of time, dropped whole
+SECURITY_LOG_PARTITION_PREFIX = 'security_logs_p'
+SECURITY_LOG_DEFAULT_PARTITION = 'security_logs_default'
+SECURITY_LOG_PARTITIONS_AHEAD = int(os.environ.get('SECURITY_LOG_PARTITIONS_AHEAD', '7'))  # days
+SECURITY_LOG_RETENTION_DAYS = int(os.environ.get('SECURITY_LOG_RETENTION_DAYS', '0'))  # 0 keeps everything
+
+def security_log_partition_name(day: date) -> str:
+    return f"{SECURITY_LOG_PARTITION_PREFIX}{day:%Y%m%d}"
+
+async def is_security_logs_partitioned() -> bool:
+    """False until migration 002 has run"""
+    relkind = await database.fetch_val(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('security_logs')"
+    )
+    return relkind == 'p'
+
+async def list_security_log_partitions() -> Dict[str, date]:
+    """Map of daily partition name -> UTC day it covers (DEFAULT partition excluded)"""
+    rows = await database.fetch_all(
+        "SELECT child.relname AS name FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass('security_logs')"
+    )
+    partitions = {}
+    for row in rows:
+        name = row['name']
+        if name.startswith(SECURITY_LOG_PARTITION_PREFIX):
+            partitions[name] = datetime.strptime(name[len(SECURITY_LOG_PARTITION_PREFIX):], '%Y%m%d').date()
+    return partitions
+
+async def ensure_security_log_partitions(days_ahead: int = SECURITY_LOG_PARTITIONS_AHEAD) -> Tuple[List[str], Dict[str, str]]:
+    """Create any missing daily partitions from today through days_ahead
+
+    Returns (created, failed) where failed maps partition name -> error. One
+    day failing - typically because the DEFAULT partition already holds rows
+    for it - must not stop the days after it from being created.
+    """
+    existing = await list_security_log_partitions()
+    await database.execute(
+        f"CREATE TABLE IF NOT EXISTS {SECURITY_LOG_DEFAULT_PARTITION} PARTITION OF security_logs DEFAULT"
+    )
+    
+    created = []
+    failed = {}
+    today = datetime.now(timezone.utc).date()
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        name = security_log_partition_name(day)
+        if name in existing:
+            continue
+        try:
+            await database.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF security_logs "
+                f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+            )
+        except Exception as e:
+            print(f"⚠️ Could not create security_logs partition {name}: {e}")
+            failed[name] = str(e)
+            continue
+        created.append(name)
+    return created, failed
+
+async def count_default_partition_rows() -> Dict[str, int]:
+    """Rows per UTC day stranded in the DEFAULT partition
+
+    Retention only drops daily partitions, so anything here is kept forever
+    until an operator moves it (detach DEFAULT, create the day, re-insert).
+    """
+    rows = await database.fetch_all(
+        f"SELECT (\"timestamp\" AT TIME ZONE 'UTC')::date AS day, count(*) AS row_count "
+        f"FROM {SECURITY_LOG_DEFAULT_PARTITION} GROUP BY 1 ORDER BY 1"
+    )
+    return {row['day'].isoformat(): row['row_count'] for row in rows}
+
+async def drop_security_log_partition(name: str, detach_only: bool = False):
+    """Detach (and by default drop) one partition by name"""
+    if not name.startswith(SECURITY_LOG_PARTITION_PREFIX):
+        raise ValueError(f"Not a daily security_logs partition: {name}")
+    await database.execute(f"ALTER TABLE security_logs DETACH PARTITION {name}")
+    if not detach_only:
+        await database.execute(f"DROP TABLE {name}")
+
+async def drop_security_log_partitions(older_than: date, detach_only: bool = False) -> List[str]:
+    """Retention: detach (and by default drop) whole partitions for days before older_than
+
+    O(1) catalog operations regardless of row count - no DELETE, no vacuum debt.
+    """
+    removed = []
+    partitions = await list_security_log_partitions()
+    for name, day in sorted(partitions.items(), key=lambda item: item[1]):
+        if day >= older_than:
+            continue
+        await drop_security_log_partition(name, detach_only)
+        removed.append(name)
+    return removed
+
+async def count_security_logs(since: datetime, until: datetime) -> int:
+    """Rows with since <= timestamp < until"""
+    return await database.fetch_val(
+        'SELECT count(*) FROM security_logs WHERE "timestamp" >= :since AND "timestamp" < :until',
+        values={'since': since, 'until': until}
+    )
+
+async def delete_security_logs_batch(since: datetime, until: datetime, batch_size: int) -> int:
+    """Delete at most batch_size rows in [since, until), returning how many went
+
+    Small batches keep each transaction short, so row locks, WAL bursts and
+    replication lag stay bounded while a large range is cleared.
+    """
+    async with database.observe('delete_security_logs_batch') as result:
+        async with database.connection() as connection:
+            status = await connection.raw_connection.execute(
+                'DELETE FROM security_logs WHERE (id, "timestamp") IN ('
+                'SELECT id, "timestamp" FROM security_logs '
+                'WHERE "timestamp" >= $1 AND "timestamp" < $2 LIMIT $3)',
+                since, until, batch_size
+            )
+        result["rows"] = rows_from_status(status)
+    return result["rows"]
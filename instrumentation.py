@@ -0,0 +1,304 @@
+"""
+Query instrumentation for the databases layer
+Per-query latency histograms, row counts, pool wait time, a slow-query log
+with redacted parameters and sampled EXPLAIN (ANALYZE, BUFFERS) capture
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+
+import databases
+from sqlalchemy.sql import ClauseElement
+
+DB_SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', '250'))
+DB_EXPLAIN_SAMPLE_RATE = float(os.environ.get('DB_EXPLAIN_SAMPLE_RATE', '0'))  # 0..1 of slow SELECTs
+DB_EXPLAIN_KEEP = 20  # most recent plans kept for the admin endpoint
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+_STATEMENT_VERB = re.compile(r'^\s*(\w+)')
+_STATEMENT_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+"?(\w+)', re.IGNORECASE)
+_STATUS_ROWS = re.compile(r'^(?:INSERT \d+|UPDATE|DELETE|SELECT|COPY|MOVE|FETCH) (\d+)$')
+
+# The call being timed in this task, so pool waits are attributed to it
+_current_call: contextvars.ContextVar[Optional['_CallTiming']] = contextvars.ContextVar('_current_call', default=None)
+
+def statement_name(query: Any) -> str:
+    """Stable low-cardinality name for a statement: '<verb> <table>'"""
+    if isinstance(query, ClauseElement):
+        verb = getattr(query, '__visit_name__', 'statement')
+        table = getattr(query, 'table', None)
+        if table is None:
+            froms = getattr(query, 'get_final_froms', None)
+            froms = froms() if froms else []
+            table = froms[0] if froms else None
+        table_name = getattr(table, 'name', None) or 'query'
+        return f"{verb} {table_name}".lower()
+    text = str(query)
+    verb = _STATEMENT_VERB.match(text)
+    table = _STATEMENT_TABLE.search(text)
+    return f"{verb.group(1) if verb else 'statement'} {table.group(1) if table else 'query'}".lower()
+
+def rows_from_status(status: Any) -> Optional[int]:
+    """Row count from an asyncpg command status such as 'INSERT 0 1'"""
+    match = _STATUS_ROWS.match(status) if isinstance(status, str) else None
+    return int(match.group(1)) if match else None
+
+def redact_params(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Parameter names and types only - values never reach the log"""
+    if not params:
+        return {}
+    redacted = {}
+    for name, value in params.items():
+        if value is None:
+            redacted[name] = 'NULL'
+        elif isinstance(value, (str, bytes)):
+            redacted[name] = f"<{type(value).__name__} len={len(value)}>"
+        else:
+            redacted[name] = f"<{type(value).__name__}>"
+    return redacted
+
+class _CallTiming:
+    __slots__ = ('pool_wait',)
+
+    def __init__(self):
+        self.pool_wait = 0.0
+
+class QueryStats:
+    """Latency histogram and counters for one statement name"""
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.pool_wait_ms = 0.0
+        self.slow = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def observe(self, elapsed_ms: float, rows: Optional[int], pool_wait_ms: float, failed: bool):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.pool_wait_ms += pool_wait_ms
+        if rows is not None:
+            self.rows += rows
+        if failed:
+            self.errors += 1
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, fraction: float) -> float:
+        """Bucket upper bound containing the given fraction of calls"""
+        target = self.count * fraction
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += hits
+            if seen >= target:
+                return self.max_ms if bound == float('inf') else bound
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "slow": self.slow,
+            "rows": self.rows,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "pool_wait_ms": round(self.pool_wait_ms, 3),
+            "histogram": {
+                ("+inf" if bound == float('inf') else f"le_{bound}"): hits
+                for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets)
+            }
+        }
+
+class TimedPool:
+    """asyncpg pool proxy that measures how long callers wait for a connection"""
+    def __init__(self, pool, instrumented: 'InstrumentedDatabase'):
+        self._pool = pool
+        self._instrumented = instrumented
+
+    async def acquire(self, *args, **kwargs):
+        self._instrumented.pool_waiting += 1
+        start = time.perf_counter()
+        try:
+            return await self._pool.acquire(*args, **kwargs)
+        finally:
+            waited = time.perf_counter() - start
+            self._instrumented.pool_waiting -= 1
+            self._instrumented.pool_acquires += 1
+            self._instrumented.pool_wait_total += waited
+            timing = _current_call.get()
+            if timing is not None:
+                timing.pool_wait += waited
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+class InstrumentedDatabase(databases.Database):
+    """databases.Database that records every statement it runs
+
+    Drop-in: the public API is unchanged, so call sites need no edits.
+    Statements are named '<verb> <table>' unless a name is supplied via
+    observe() (used for raw asyncpg fast paths).
+    """
+    def __init__(self, url: str, slow_query_ms: float = DB_SLOW_QUERY_MS,
+                 explain_sample_rate: float = DB_EXPLAIN_SAMPLE_RATE, **options: Any):
+        super().__init__(url, **options)
+        self.slow_query_ms = slow_query_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.query_stats: Dict[str, QueryStats] = {}
+        self.recent_plans: deque = deque(maxlen=DB_EXPLAIN_KEEP)
+        self.pool_waiting = 0
+        self.pool_acquires = 0
+        self.pool_wait_total = 0.0
+        self._explain_tasks: set = set()
+
+    async def connect(self) -> None:
+        await super().connect()
+        pool = getattr(self._backend, '_pool', None)
+        if pool is not None and not isinstance(pool, TimedPool):
+            self._backend._pool = TimedPool(pool, self)
+
+    @asynccontextmanager
+    async def observe(self, name: str, query: Any = None, values: Optional[dict] = None):
+        """Time a block as one statement; set .rows on the yielded dict if known"""
+        timing = _CallTiming()
+        token = _current_call.set(timing)
+        result = {"rows": None}
+        failed = False
+        start = time.perf_counter()
+        try:
+            yield result
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _current_call.reset(token)
+            self._record(name, elapsed_ms, result["rows"], timing.pool_wait * 1000, failed, query, values)
+
+    def _record(self, name: str, elapsed_ms: float, rows: Optional[int], pool_wait_ms: float,
+                failed: bool, query: Any, values: Optional[dict]):
+        stats = self.query_stats.get(name)
+        if stats is None:
+            stats = self.query_stats[name] = QueryStats()
+        stats.observe(elapsed_ms, rows, pool_wait_ms, failed)
+        if elapsed_ms < self.slow_query_ms:
+            return
+        stats.slow += 1
+        sql, params = self._describe(query, values)
+        print(f"🐢 Slow query {name}: {elapsed_ms:.1f}ms (pool wait {pool_wait_ms:.1f}ms) "
+              f"sql={sql!r} params={redact_params(params)}")
+        if (query is not None and not failed and name.startswith('select')
+                and self.explain_sample_rate > 0 and random.random() < self.explain_sample_rate
+                and not self._explain_tasks):
+            task = asyncio.create_task(self._capture_plan(name, query, values, elapsed_ms))
+            self._explain_tasks.add(task)
+            task.add_done_callback(self._explain_tasks.discard)
+
+    def _describe(self, query: Any, values: Optional[dict]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if query is None:
+            return '', values
+        if isinstance(query, ClauseElement):
+            compiled = query.compile(dialect=self._backend._dialect)
+            return ' '.join(str(compiled).split())[:500], compiled.params
+        return ' '.join(str(query).split())[:500], values
+
+    async def _capture_plan(self, name: str, query: Any, values: Optional[dict], elapsed_ms: float):
+        """EXPLAIN (ANALYZE, BUFFERS) a slow SELECT - reads only, never writes"""
+        try:
+            async with self.connection() as connection:
+                built = connection._build_query(query, values)
+                sql, args, _ = connection._connection._compile(built)
+                raw = connection.raw_connection
+                async with raw.transaction(readonly=True):
+                    rows = await raw.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *args)
+            plan = '\n'.join(row[0] for row in rows)
+            self.recent_plans.append({
+                "name": name,
+                "elapsed_ms": round(elapsed_ms, 3),
+                "captured_at": time.time(),
+                "plan": plan
+            })
+            print(f"🔍 EXPLAIN for slow {name}:\n{plan}")
+        except Exception as e:
+            print(f"⚠️ EXPLAIN capture failed for {name}: {e}")
+
+    async def execute(self, query, values: Optional[dict] = None):
+        async with self.observe(statement_name(query), query, values):
+            return await super().execute(query, values)
+
+    async def execute_many(self, query, values: list):
+        async with self.observe(statement_name(query), query) as result:
+            result["rows"] = len(values)
+            return await super().execute_many(query, values)
+
+    async def fetch_all(self, query, values: Optional[dict] = None):
+        async with self.observe(statement_name(query), query, values) as result:
+            rows = await super().fetch_all(query, values)
+            result["rows"] = len(rows)
+            return rows
+
+    async def fetch_one(self, query, values: Optional[dict] = None):
+        async with self.observe(statement_name(query), query, values) as result:
+            row = await super().fetch_one(query, values)
+            result["rows"] = 0 if row is None else 1
+            return row
+
+    async def fetch_val(self, query, values: Optional[dict] = None, column: Any = 0):
+        async with self.observe(statement_name(query), query, values) as result:
+            value = await super().fetch_val(query, values, column=column)
+            result["rows"] = 0 if value is None else 1
+            return value
+
+    async def iterate(self, query, values: Optional[dict] = None):
+        # Streams are timed end to end; they are long by design, so never "slow"
+        name = statement_name(query)
+        timing = _CallTiming()
+        token = _current_call.set(timing)
+        rows = 0
+        failed = False
+        start = time.perf_counter()
+        try:
+            async for record in super().iterate(query, values):
+                yield record
+                rows += 1
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            try:
+                _current_call.reset(token)
+            except ValueError:
+                pass  # generator finalised in another context
+            stats = self.query_stats.setdefault(f"stream {name}", QueryStats())
+            stats.observe((time.perf_counter() - start) * 1000, rows, timing.pool_wait * 1000, failed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-statement snapshot for the admin stats endpoint"""
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "explain_sample_rate": self.explain_sample_rate,
+            "pool": {
+                "acquires": self.pool_acquires,
+                "waiting": self.pool_waiting,
+                "wait_total_ms": round(self.pool_wait_total * 1000, 3)
+            },
+            "queries": {name: stats.snapshot() for name, stats in sorted(self.query_stats.items())},
+            "recent_plans": list(self.recent_plans)
+        }
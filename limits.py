@@ -0,0 +1,186 @@
+"""
+Request limits as pure ASGI middleware
+Per-route request body caps enforced while the body streams in (never
+buffered first), a deadline for receiving the body and per-route handler
+deadlines, with counters for every rejection
+
+Header size and header read time cannot be limited here: the ASGI app
+is only called once the server has parsed the complete header block.
+Both are left to the reverse proxy in front of uvicorn (its httptools
+parser, the default with uvicorn[standard], has no header size option).
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from starlette.responses import JSONResponse
+
+# Rejections by reason, plus per-route totals for the health endpoint
+request_limit_stats: Dict[str, Any] = {
+    "content_length_rejected": 0,
+    "body_too_large": 0,
+    "body_timeout": 0,
+    "invalid_content_length": 0,
+    "by_route": {}
+}
+
+def _count(reason: str, path: str):
+    request_limit_stats[reason] += 1
+    by_route = request_limit_stats["by_route"]
+    by_route[path] = by_route.get(path, 0) + 1
+
+class RequestLimitsMiddleware:
+    """Cap request bodies per route and bound how long a client may take to send one"""
+    def __init__(self, app, max_body_bytes: int, body_timeout: float,
+                 route_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.body_timeout = body_timeout
+        self.route_limits = route_limits or {}
+
+    def limit_for(self, path: str) -> int:
+        return self.route_limits.get(path, self.max_body_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        limit = self.limit_for(path)
+
+        # Cheap pre-check: an honest oversized Content-Length is refused before any body is read
+        content_length = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                content_length = value
+                break
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+                if declared < 0:
+                    raise ValueError(content_length)
+            except ValueError:
+                _count("invalid_content_length", path)
+                await JSONResponse(status_code=400, content={"detail": "Invalid Content-Length"},
+                                   headers={"Connection": "close"})(scope, receive, send)
+                return
+            if declared > limit:
+                _count("content_length_rejected", path)
+                await JSONResponse(status_code=413, content={"detail": f"Request body exceeds {limit} bytes"},
+                                   headers={"Connection": "close"})(scope, receive, send)
+                return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.body_timeout
+        received = 0
+        body_complete = False
+        response_started = False
+        rejected = False
+
+        async def reject(status_code: int, detail: str):
+            """Answer the client now and tell the app the client has gone"""
+            nonlocal rejected
+            if not response_started:
+                await JSONResponse(status_code=status_code, content={"detail": detail},
+                                   headers={"Connection": "close"})(scope, receive, send)
+            rejected = True
+            return {"type": "http.disconnect"}
+
+        async def limited_receive():
+            nonlocal received, body_complete
+            if rejected:
+                return {"type": "http.disconnect"}
+            if body_complete:
+                # Body is in - later receives wait for disconnect and are not time-limited
+                return await receive()
+            try:
+                message = await asyncio.wait_for(receive(), timeout=max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                _count("body_timeout", path)
+                return await reject(408, f"Request body not received within {self.body_timeout:g}s")
+            if message["type"] == "http.request":
+                # Chunked bodies have no Content-Length, so count as the chunks arrive
+                received += len(message.get("body", b""))
+                if received > limit:
+                    _count("body_too_large", path)
+                    return await reject(413, f"Request body exceeds {limit} bytes")
+                body_complete = not message.get("more_body", False)
+            else:
+                body_complete = True
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return  # the app's reply to the disconnect; the client already has ours
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        # Raising from receive() would not survive BaseHTTPMiddleware's task groups
+        # (FastAPI turns the wrapped error into a 400), so the limit answers itself
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+# Handler deadline expiries per route
+route_deadline_stats: Dict[str, Any] = {
+    "timeouts": 0,
+    "by_route": {}
+}
+
+class RouteDeadlineMiddleware:
+    """Cancel a request's handler task if it has not started responding by its deadline
+
+    Cancellation is cooperative: CancelledError unwinds the handler through its
+    own async with blocks, so pool connections, transactions, bulkhead slots and
+    idempotency claims are released by the code that took them. The deadline is
+    disarmed once the response starts - streaming responses (exports) bound
+    themselves and a half-sent body cannot be turned into a 504.
+    """
+    def __init__(self, app, default_deadline: Optional[float],
+                 route_deadlines: Optional[Dict[str, Optional[float]]] = None, prefix: str = "/api/"):
+        self.app = app
+        self.default_deadline = default_deadline
+        self.route_deadlines = route_deadlines or {}
+        self.prefix = prefix
+
+    def deadline_for(self, path: str) -> Optional[float]:
+        if path in self.route_deadlines:
+            return self.route_deadlines[path]
+        return self.default_deadline if path.startswith(self.prefix) else None
+
+    async def __call__(self, scope, receive, send):
+        deadline = self.deadline_for(scope["path"]) if scope["type"] == "http" else None
+        if not deadline:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+        timeout = asyncio.timeout(deadline)
+
+        async def disarming_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                timeout.reschedule(None)
+            await send(message)
+
+        try:
+            async with timeout:
+                await self.app(scope, receive, disarming_send)
+            return
+        except TimeoutError:
+            if not timeout.expired():
+                raise  # raised by the handler itself, not by our deadline
+
+        path = scope["path"]
+        route_deadline_stats["timeouts"] += 1
+        by_route = route_deadline_stats["by_route"]
+        by_route[path] = by_route.get(path, 0) + 1
+        print(f"⏱️ {scope['method']} {path} cancelled after {deadline:g}s deadline")
+        if not response_started:
+            await JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})(scope, receive, send)
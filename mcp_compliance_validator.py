@@ -572,10 +572,10 @@ class MCPComplianceValidator:
         """Validate database schema"""
         try:
             sys.path.append('/app')
-            from database import metadata, engine
+            from database import metadata, get_engine
             
             # Check if tables exist
-            metadata.reflect(bind=engine)
+            metadata.reflect(bind=get_engine())
             required_tables = ['contact_submissions', 'security_logs', 'sessions']
             
             existing_tables = list(metadata.tables.keys())
@@ -0,0 +1,18 @@
+"""
+Reference input sanitizer
+The original bleach-every-field sanitize_input, kept verbatim as the oracle
+the differential tests and the sanitizer benchmark compare server.sanitize_input against
+"""
+
+import bleach
+
+def reference_sanitize_input(data: str, max_length: int = 1000) -> str:
+    """The original implementation, kept verbatim as the oracle"""
+    if not data:
+        return ""
+    data = data[:max_length]
+    sanitized = bleach.clean(data, tags=[], attributes={}, strip=True)
+    dangerous_patterns = ['$', '{', '}', '..', '<script', 'javascript:', 'eval(']
+    for pattern in dangerous_patterns:
+        sanitized = sanitized.replace(pattern, '')
+    return sanitized.strip()
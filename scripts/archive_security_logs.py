@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Security Log Archiver
+Moves aged security_logs rows out of PostgreSQL into compressed files on local
+disk (one file per UTC day, Parquet when pyarrow is installed, otherwise
+NDJSON.gz), records every file in manifest.json, then removes the archived
+rows - dropping the day's partition when it has one, otherwise deleting in
+bounded batches.
+
+Usage:
+    DATABASE_URL=... python scripts/archive_security_logs.py archive --older-than-days 30
+    DATABASE_URL=... python scripts/archive_security_logs.py archive --keep-rows     # files only
+    python scripts/archive_security_logs.py scan --since 2026-01-01 --until 2026-01-02 --event-type csrf_validation_failed
+
+Run this before SECURITY_LOG_RETENTION_DAYS would drop the same partitions.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, AsyncIterable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from export import encode_ndjson
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:
+    pyarrow = None
+
+ARCHIVE_DIR = os.environ.get('SECURITY_LOG_ARCHIVE_DIR', 'data/archive/security_logs')
+MANIFEST_NAME = 'manifest.json'
+ARCHIVE_WRITE_BATCH = 10000  # rows per Parquet row group / write call
+ARCHIVE_FORMATS = {'parquet': '.parquet', 'ndjson': '.ndjson.gz'}
+
+def default_format() -> str:
+    return 'parquet' if pyarrow is not None else 'ndjson'
+
+def _fsync_path(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def load_manifest(directory: str) -> Dict[str, Any]:
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": 1, "table": "security_logs", "files": []}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(directory: str, manifest: Dict[str, Any]):
+    """Atomically replace manifest.json"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_path(directory)
+
+class NdjsonGzWriter:
+    """One gzip stream of compact JSON lines"""
+    def __init__(self, path: str):
+        self._file = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+
+    def write_batch(self, rows: List[Dict[str, Any]]):
+        self._file.write(''.join(encode_ndjson(row) for row in rows))
+
+    def close(self):
+        self._file.close()
+
+class ParquetArchiveWriter:
+    """Parquet file with one row group per batch; timestamp stats allow row-group pruning"""
+    def __init__(self, path: str):
+        self.schema = pyarrow.schema([
+            ('id', pyarrow.string()),
+            ('event_type', pyarrow.string()),
+            ('timestamp', pyarrow.timestamp('us', tz='UTC')),
+            ('client_ip', pyarrow.string()),
+            ('details', pyarrow.string()),
+            ('severity', pyarrow.string()),
+        ])
+        self._writer = parquet.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write_batch(self, rows: List[Dict[str, Any]]):
+        columns = {
+            'id': [str(row['id']) for row in rows],
+            'event_type': [row['event_type'] for row in rows],
+            'timestamp': [row['timestamp'] for row in rows],
+            'client_ip': [row['client_ip'] for row in rows],
+            'details': [None if row['details'] is None else json.dumps(row['details'], separators=(',', ':'))
+                        for row in rows],
+            'severity': [row['severity'] for row in rows],
+        }
+        self._writer.write_table(pyarrow.table(columns, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+async def write_archive_file(rows: AsyncIterable[Dict[str, Any]], path: str,
+                             archive_format: str) -> Optional[Dict[str, Any]]:
+    """Stream time-ordered rows into path; None (and no file) when there were none"""
+    tmp_path = path + '.tmp'
+    writer = ParquetArchiveWriter(tmp_path) if archive_format == 'parquet' else NdjsonGzWriter(tmp_path)
+    count = 0
+    first = last = None
+    batch = []
+    try:
+        async for row in rows:
+            if first is None:
+                first = row['timestamp']
+            last = row['timestamp']
+            batch.append(row)
+            if len(batch) >= ARCHIVE_WRITE_BATCH:
+                writer.write_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+
+    if count == 0:
+        os.remove(tmp_path)
+        return None
+    _fsync_path(tmp_path)
+    os.replace(tmp_path, path)
+    _fsync_path(os.path.dirname(path))
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {
+        "format": archive_format,
+        "rows": count,
+        "min_timestamp": first.isoformat(),
+        "max_timestamp": last.isoformat(),
+        "sha256": digest.hexdigest(),
+        "bytes": os.path.getsize(path),
+    }
+
+async def remove_archived_day(day: date, since: datetime, until: datetime, batch_size: int,
+                              pause: float, detach_only: bool) -> str:
+    """Remove one archived day, preferring an O(1) partition drop over DELETE"""
+    if await database.is_security_logs_partitioned():
+        partitions = await database.list_security_log_partitions()
+        name = database.security_log_partition_name(day)
+        if name in partitions:
+            await database.drop_security_log_partition(name, detach_only)
+            return 'detached' if detach_only else 'dropped'
+
+    deleted = 0
+    while True:
+        removed = await database.delete_security_logs_batch(since, until, batch_size)
+        deleted += removed
+        if removed < batch_size:
+            return f'deleted {deleted} rows'
+        await asyncio.sleep(pause)
+
+async def archive(directory: str, older_than_days: int, archive_format: str, batch_size: int,
+                  pause: float, keep_rows: bool, detach_only: bool):
+    await database.db_manager.connect()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        manifest = load_manifest(directory)
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=older_than_days)
+        oldest = await database.database.fetch_val('SELECT min("timestamp") FROM security_logs')
+        if oldest is None or oldest.astimezone(timezone.utc).date() >= cutoff:
+            print(f"Nothing older than {cutoff} to archive")
+            return
+
+        day = oldest.astimezone(timezone.utc).date()
+        while day < cutoff:
+            since = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            until = since + timedelta(days=1)
+
+            # A file whose rows were never removed would duplicate this run's output
+            for stale in [e for e in manifest['files'] if e['day'] == day.isoformat() and not e['removed']]:
+                stale_path = os.path.join(directory, stale['file'])
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+                manifest['files'].remove(stale)
+
+            part = sum(1 for e in manifest['files'] if e['day'] == day.isoformat())
+            suffix = f"-{part}" if part else ""
+            relative = os.path.join(f"{day:%Y}", f"{day:%m}",
+                                    f"security_logs-{day:%Y%m%d}{suffix}{ARCHIVE_FORMATS[archive_format]}")
+            path = os.path.join(directory, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            start = time.perf_counter()
+            entry = await write_archive_file(database.iterate_export('security_logs', since, until),
+                                             path, archive_format)
+            if entry is None:
+                day += timedelta(days=1)
+                continue
+            entry.update({
+                "file": relative,
+                "day": day.isoformat(),
+                "archived_at": datetime.now(timezone.utc).isoformat(),
+                "removed": False,
+            })
+            manifest['files'].append(entry)
+            save_manifest(directory, manifest)
+            print(f"📦 {day}: {entry['rows']} rows -> {relative} ({entry['bytes']} bytes, "
+                  f"{time.perf_counter() - start:.1f}s)")
+
+            if not keep_rows:
+                # Rows that landed after the cursor's snapshot are not in the file
+                remaining = await database.count_security_logs(since, until)
+                if remaining != entry['rows']:
+                    print(f"⚠️ {day}: {remaining} rows now in range vs {entry['rows']} archived - "
+                          f"keeping rows, re-run to re-archive")
+                else:
+                    outcome = await remove_archived_day(day, since, until, batch_size, pause, detach_only)
+                    entry['removed'] = True
+                    save_manifest(directory, manifest)
+                    print(f"🗑️ {day}: {outcome}")
+            day += timedelta(days=1)
+    finally:
+        await database.db_manager.disconnect()
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+def _read_parquet(path: str, since: datetime, until: datetime) -> Iterator[Dict[str, Any]]:
+    archive_file = parquet.ParquetFile(path)
+    metadata = archive_file.metadata
+    timestamp_index = archive_file.schema_arrow.get_field_index('timestamp')
+    row_groups = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(timestamp_index).statistics
+        if stats is not None and stats.has_min_max and (stats.max < since or stats.min >= until):
+            continue
+        row_groups.append(i)
+    for batch in archive_file.iter_batches(row_groups=row_groups):
+        for row in batch.to_pylist():
+            if row['details'] is not None:
+                row['details'] = json.loads(row['details'])
+            yield row
+
+def _read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+def scan_archive(directory: str, since: datetime, until: datetime,
+                 event_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield archived rows with since <= timestamp < until, oldest first
+
+    The manifest prunes whole files, Parquet row-group statistics prune
+    within a file, and rows are streamed - no file is loaded in full.
+    """
+    manifest = load_manifest(directory)
+    entries = sorted(manifest['files'], key=lambda e: e['min_timestamp'])
+    for entry in entries:
+        if (_parse_timestamp(entry['max_timestamp']) < since
+                or _parse_timestamp(entry['min_timestamp']) >= until):
+            continue
+        path = os.path.join(directory, entry['file'])
+        if entry['format'] == 'parquet':
+            if pyarrow is None:
+                raise RuntimeError(f"pyarrow is required to read {entry['file']}")
+            rows = _read_parquet(path, since, until)
+        else:
+            rows = _read_ndjson(path)
+        for row in rows:
+            timestamp = _parse_timestamp(row['timestamp'])
+            if timestamp >= until:
+                break  # files are written in time order
+            if timestamp < since:
+                continue
+            if event_type is not None and row['event_type'] != event_type:
+                continue
+            yield row
+
+def _utc_datetime(value: str) -> datetime:
+    return database.as_utc(datetime.fromisoformat(value))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--directory', default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    archive_cmd = sub.add_parser('archive', help='archive and remove security_logs rows older than N days')
+    archive_cmd.add_argument('--older-than-days', type=int, default=30)
+    archive_cmd.add_argument('--format', choices=sorted(ARCHIVE_FORMATS), default=default_format())
+    archive_cmd.add_argument('--batch-size', type=int, default=5000, help='rows per DELETE batch')
+    archive_cmd.add_argument('--pause', type=float, default=0.1, help='seconds between DELETE batches')
+    archive_cmd.add_argument('--keep-rows', action='store_true', help='write archives but leave rows in place')
+    archive_cmd.add_argument('--detach-only', action='store_true', help='detach archived partitions instead of dropping')
+    scan_cmd = sub.add_parser('scan', help='print archived rows in a time range as NDJSON')
+    scan_cmd.add_argument('--since', type=_utc_datetime, required=True)
+    scan_cmd.add_argument('--until', type=_utc_datetime, required=True)
+    scan_cmd.add_argument('--event-type')
+    args = parser.parse_args()
+
+    if args.command == 'archive':
+        if args.format == 'parquet' and pyarrow is None:
+            parser.error('parquet output needs pyarrow installed')
+        asyncio.run(archive(args.directory, args.older_than_days, args.format, args.batch_size,
+                            args.pause, args.keep_rows, args.detach_only))
+    elif args.command == 'scan':
+        for row in scan_archive(args.directory, args.since, args.until, args.event_type):
+            sys.stdout.write(encode_ndjson(row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Database Microbenchmarks
+Compares hot-path implementations in database.py against a local PostgreSQL.
+
+Usage (schema must be at `alembic upgrade head`):
+    DATABASE_URL=postgresql://localhost:5432/copperhead_bench python scripts/bench_database.py inserts
+    DATABASE_URL=... python scripts/bench_database.py copy --sizes 10000 100000 1000000
+    DATABASE_URL=... python scripts/bench_database.py indexes --rows 1000000
+    DATABASE_URL=... python scripts/bench_database.py uuid --rows 1000000
+    python scripts/bench_database.py compile   # no database needed
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+def report(label, latencies, cpu_seconds):
+    """Print per-operation latency percentiles and CPU cost"""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    p50 = latencies[count // 2] * 1e6
+    p99 = latencies[min(count - 1, int(count * 0.99))] * 1e6
+    mean = statistics.fmean(latencies) * 1e6
+    cpu = cpu_seconds / count * 1e6
+    print(f"  {label:<12} n={count:<7} mean={mean:8.1f}us  p50={p50:8.1f}us  p99={p99:8.1f}us  cpu={cpu:7.1f}us/op")
+
+async def time_calls(make_call, iterations):
+    """Run make_call() sequentially, returning (latencies, cpu_seconds)"""
+    latencies = []
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await make_call()
+        latencies.append(time.perf_counter() - start)
+    return latencies, time.process_time() - cpu_start
+
+async def bench_inserts(iterations, warmup):
+    """SQLAlchemy/databases path vs asyncpg fast path for the hot inserts"""
+    await database.db_manager.connect()
+    inserted = {'security_logs': [], 'contact_submissions': []}
+
+    async def security_log():
+        inserted['security_logs'].append(await database.insert_security_log(
+            'bench_event', '127.0.0.1', {'bench': True, 'fingerprint': 'abcdef0123456789'}, 'low'
+        ))
+
+    async def contact_submission():
+        inserted['contact_submissions'].append(await database.insert_contact_submission({
+            'name': 'Bench User',
+            'email': 'bench@example.com',
+            'message': 'Benchmark message ' * 8,
+            'client_fingerprint': 'abcdef0123456789',
+            'status': 'bench'
+        }))
+
+    try:
+        for name, make_call in (('insert_security_log', security_log),
+                                ('insert_contact_submission', contact_submission)):
+            print(f"{name}:")
+            for label, fast_path in (('sqlalchemy', False), ('fast-path', True)):
+                database.DB_FAST_PATH = fast_path
+                await time_calls(make_call, warmup)
+                report(label, *await time_calls(make_call, iterations))
+    finally:
+        for table, ids in inserted.items():
+            if ids:
+                await database.database.execute(
+                    f"DELETE FROM {table} WHERE id = ANY(CAST(:ids AS uuid[]))", {'ids': ids}
+                )
+        await database.db_manager.disconnect()
+
+def synthetic_security_logs(count, run_tag):
+    """Generate security_logs records shaped like log_security_event output"""
+    for i in range(count):
+        yield {
+            'event_type': 'bench_copy',
+            'client_ip': f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+            'details': {'run': run_tag, 'fingerprint': f"{i:016x}", 'requests': i % 100},
+            'severity': 'low'
+        }
+
+async def bench_copy(sizes, batch_size, compare_insert):
+    """Rows/second for COPY-based bulk_ingest vs multi-row INSERT"""
+    await database.db_manager.connect()
+    run_tag = f"bench-{int(time.time())}"
+    try:
+        for size in sizes:
+            start = time.perf_counter()
+            await database.bulk_ingest('security_logs', synthetic_security_logs(size, run_tag), batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"  COPY         rows={size:<9} {size / elapsed:12,.0f} rows/s  ({elapsed:.2f}s)")
+
+            if compare_insert:
+                columns, to_row = database.BULK_INGEST_TABLES['security_logs']
+                rows = [to_row(record) for record in synthetic_security_logs(size, run_tag)]
+                start = time.perf_counter()
+                async with database.database.connection() as connection:
+                    raw = connection.raw_connection
+                    for offset in range(0, size, batch_size):
+                        async with raw.transaction():
+                            await raw.executemany(
+                                "INSERT INTO security_logs (id, event_type, timestamp, client_ip, details, severity) "
+                                "VALUES ($1, $2, $3, $4, $5, $6)",
+                                rows[offset:offset + batch_size]
+                            )
+                elapsed = time.perf_counter() - start
+                print(f"  INSERT       rows={size:<9} {size / elapsed:12,.0f} rows/s  ({elapsed:.2f}s)")
+    finally:
+        await database.database.execute(
+            "DELETE FROM security_logs WHERE event_type = 'bench_copy' AND details->>'run' = :run",
+            {'run': run_tag}
+        )
+        await database.db_manager.disconnect()
+
+INDEX_LAYOUTS = {
+    'btree (001)': [
+        "CREATE INDEX ON {table} (event_type)",
+        "CREATE INDEX ON {table} (\"timestamp\")",
+        "CREATE INDEX ON {table} (client_ip)",
+    ],
+    'brin (003)': [
+        "CREATE INDEX ON {table} (event_type, \"timestamp\") INCLUDE (severity)",
+        "CREATE INDEX ON {table} USING brin (\"timestamp\") WITH (pages_per_range = 32)",
+        "CREATE INDEX ON {table} (client_ip)",
+    ],
+}
+
+RANGE_QUERIES = {
+    'count 1h window': (
+        "SELECT count(*) FROM {table} WHERE \"timestamp\" >= $1 AND \"timestamp\" < $1 + interval '1 hour'"
+    ),
+    'type+severity 1h': (
+        "SELECT severity, count(*) FROM {table} WHERE event_type = 'rate_limit_exceeded' "
+        "AND \"timestamp\" >= $1 AND \"timestamp\" < $1 + interval '1 hour' GROUP BY severity"
+    ),
+}
+
+async def bench_indexes(rows, batch_size, queries):
+    """Insert throughput, index size and range-query latency: 001 B-trees vs 003 BRIN/covering"""
+    from datetime import datetime, timedelta, timezone
+    await database.db_manager.connect()
+    columns, to_row = database.BULK_INGEST_TABLES['security_logs']
+    start_time = datetime.now(timezone.utc) - timedelta(days=7)
+    step = timedelta(days=7) / rows
+    event_types = ('rate_limit_exceeded', 'csrf_validation_failed', 'contact_form_submitted')
+
+    def make_rows():
+        for i in range(rows):
+            record = {
+                'event_type': event_types[i % 3],
+                'timestamp': start_time + step * i,
+                'client_ip': f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+                'details': {'fingerprint': f"{i:016x}"},
+                'severity': 'high' if i % 3 == 0 else 'medium'
+            }
+            yield to_row(record)
+
+    try:
+        async with database.database.connection() as connection:
+            raw = connection.raw_connection
+            for label, statements in INDEX_LAYOUTS.items():
+                table = 'bench_security_logs_' + ''.join(ch for ch in label if ch.isalnum())
+                await raw.execute(f"DROP TABLE IF EXISTS {table}")
+                await raw.execute(f"CREATE TABLE {table} (LIKE security_logs INCLUDING DEFAULTS)")
+                await raw.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, \"timestamp\")")
+                for statement in statements:
+                    await raw.execute(statement.format(table=table))
+
+                generated = make_rows()
+                start = time.perf_counter()
+                while True:
+                    batch = [row for _, row in zip(range(batch_size), generated)]
+                    if not batch:
+                        break
+                    await raw.executemany(
+                        f"INSERT INTO {table} (id, event_type, \"timestamp\", client_ip, details, severity) "
+                        f"VALUES ($1, $2, $3, $4, $5, $6)", batch
+                    )
+                elapsed = time.perf_counter() - start
+                await raw.execute(f"VACUUM ANALYZE {table}")
+                index_bytes = await raw.fetchval(f"SELECT pg_indexes_size('{table}')")
+                print(f"{label}: insert {rows / elapsed:10,.0f} rows/s, indexes {index_bytes / 1048576:8.1f} MiB")
+
+                for query_label, sql in RANGE_QUERIES.items():
+                    latencies = []
+                    for q in range(queries):
+                        window = start_time + timedelta(hours=(q * 7) % 160)
+                        t0 = time.perf_counter()
+                        await raw.fetch(sql.format(table=table), window)
+                        latencies.append(time.perf_counter() - t0)
+                    report(query_label, latencies, 0.0)
+                await raw.execute(f"DROP TABLE {table}")
+    finally:
+        await database.db_manager.disconnect()
+
+async def bench_uuid(rows, batch_size):
+    """Insert throughput and primary-key index size: random uuid4 vs time-ordered uuid7"""
+    import uuid
+    await database.db_manager.connect()
+    try:
+        async with database.database.connection() as connection:
+            raw = connection.raw_connection
+            for label, generate in (('uuid4', uuid.uuid4), ('uuid7', database.uuid7)):
+                table = f"bench_pk_{label}"
+                await raw.execute(f"DROP TABLE IF EXISTS {table}")
+                await raw.execute(
+                    f"CREATE TABLE {table} (id UUID PRIMARY KEY, event_type VARCHAR(50), "
+                    f"\"timestamp\" TIMESTAMPTZ DEFAULT now())"
+                )
+                start = time.perf_counter()
+                for offset in range(0, rows, batch_size):
+                    count = min(batch_size, rows - offset)
+                    await raw.executemany(
+                        f"INSERT INTO {table} (id, event_type) VALUES ($1, $2)",
+                        [(generate(), 'bench') for _ in range(count)]
+                    )
+                elapsed = time.perf_counter() - start
+                index_bytes = await raw.fetchval(f"SELECT pg_relation_size('{table}_pkey')")
+                print(f"  {label}: insert {rows / elapsed:10,.0f} rows/s, pkey index {index_bytes / 1048576:8.1f} MiB")
+                await raw.execute(f"DROP TABLE {table}")
+    finally:
+        await database.db_manager.disconnect()
+
+def bench_compile(iterations):
+    """CPU spent compiling SQLAlchemy inserts - the per-call work the fast path removes"""
+    from sqlalchemy.dialects.postgresql import asyncpg as pg_asyncpg
+    dialect = pg_asyncpg.dialect(paramstyle='pyformat')
+
+    def compile_once():
+        query = database.security_logs.insert().values(
+            id='00000000-0000-0000-0000-000000000000',
+            event_type='bench_event',
+            client_ip='127.0.0.1',
+            details={'bench': True},
+            severity='low'
+        )
+        query.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+
+    for _ in range(200):
+        compile_once()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        compile_once()
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    print(f"SQLAlchemy insert build+compile: {elapsed / iterations * 1e6:.1f}us wall, "
+          f"{cpu / iterations * 1e6:.1f}us cpu per call")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    inserts = sub.add_parser('inserts', help='per-insert latency and CPU, current vs fast path')
+    inserts.add_argument('-n', '--iterations', type=int, default=5000)
+    inserts.add_argument('--warmup', type=int, default=200)
+    copy_cmd = sub.add_parser('copy', help='bulk_ingest throughput in rows/second')
+    copy_cmd.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    copy_cmd.add_argument('--batch-size', type=int, default=database.BULK_INGEST_BATCH_SIZE)
+    copy_cmd.add_argument('--compare-insert', action='store_true', help='also time batched INSERT')
+    indexes_cmd = sub.add_parser('indexes', help='insert throughput and range-query latency per index layout')
+    indexes_cmd.add_argument('--rows', type=int, default=1000000)
+    indexes_cmd.add_argument('--batch-size', type=int, default=database.BULK_INGEST_BATCH_SIZE)
+    indexes_cmd.add_argument('--queries', type=int, default=200)
+    uuid_cmd = sub.add_parser('uuid', help='insert throughput and pkey size, uuid4 vs uuid7')
+    uuid_cmd.add_argument('--rows', type=int, default=1000000)
+    uuid_cmd.add_argument('--batch-size', type=int, default=database.BULK_INGEST_BATCH_SIZE)
+    compile_cmd = sub.add_parser('compile', help='SQLAlchemy compile overhead only (no database)')
+    compile_cmd.add_argument('-n', '--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.command == 'inserts':
+        asyncio.run(bench_inserts(args.iterations, args.warmup))
+    elif args.command == 'copy':
+        asyncio.run(bench_copy(args.sizes, args.batch_size, args.compare_insert))
+    elif args.command == 'indexes':
+        asyncio.run(bench_indexes(args.rows, args.batch_size, args.queries))
+    elif args.command == 'uuid':
+        asyncio.run(bench_uuid(args.rows, args.batch_size))
+    elif args.command == 'compile':
+        bench_compile(args.iterations)
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,61 @@
-from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, StringConstraints, ValidationError
 import os
 import logging
 import traceback
 import time
 import asyncio
 import aiofiles
-from typing import Optional
+from typing import Annotated, Optional
 from functools import lru_cache
+from contextlib import asynccontextmanager
 import re
 from collections import defaultdict
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import bleach
 import secrets
+import random
 import hmac
 import hashlib
 import json
+import ipaddress
 
 # Database configuration with PostgreSQL
 from database import (
     db_manager, insert_contact_submission, insert_security_log,
     insert_session, get_session, update_session_activity, 
-    delete_session, cleanup_expired_sessions
+    delete_session, cleanup_expired_sessions, db_breaker, DatabaseUnavailable, RETRYABLE_DB_ERRORS,
+    bulk_ingest, uuid7, is_security_logs_partitioned, ensure_security_log_partitions, count_default_partition_rows,
+    drop_security_log_partitions, SECURITY_LOG_RETENTION_DAYS, list_contact_submissions,
+    search_contact_submissions, search_security_logs, security_event_rollup,
+    security_event_timeseries, iterate_export, export_columns, as_utc, DURABILITY_DURABLE
 )
+from spool import contact_spool, read_segment
+from export import encode_export, EXPORT_MEDIA_TYPES
+from limits import RequestLimitsMiddleware, RouteDeadlineMiddleware, request_limit_stats, route_deadline_stats
 
 DATABASE_CONNECTED = False
 
+# RESILIENCE: Background connection supervisor state (startup never waits on the DB)
+DB_CONNECT_BACKOFF_BASE = float(os.environ.get('DB_CONNECT_BACKOFF_BASE', '0.5'))  # seconds
+DB_CONNECT_BACKOFF_MAX = float(os.environ.get('DB_CONNECT_BACKOFF_MAX', '30'))  # seconds
+DB_HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_HEALTH_CHECK_INTERVAL', '10'))  # seconds
+# Consecutive failed health checks before the pool is dropped and rebuilt
+DB_HEALTH_FAILURE_THRESHOLD = int(os.environ.get('DB_HEALTH_FAILURE_THRESHOLD', '3'))
+PROCESS_START_TIME = time.monotonic()
+database_state = {
+    "state": "starting",
+    "attempts": 0,
+    "last_error": None,
+    "time_to_ready": None,
+    "schema": None,
+    "health_check_failures": 0
+}
+
 # SECURITY: Advanced memory-safe rate limiting with circuit breaker
 import threading
 from collections import OrderedDict
@@ -53,6 +79,73 @@ active_sessions = {}  # In production, use Redis or database
 SESSION_TIMEOUT = 1800  # 30 minutes
 SESSION_SECRET = os.environ.get('SESSION_SECRET', secrets.token_urlsafe(32))
 
+# SECURITY: Bearer token for staff-only admin endpoints (disabled when unset)
+ADMIN_API_TOKEN = os.environ.get('ADMIN_API_TOKEN', '')
+
+# SECURITY: Request body caps (bytes) and body read deadline, enforced while streaming
+MAX_REQUEST_BODY_BYTES = int(os.environ.get('MAX_REQUEST_BODY_BYTES', str(64 * 1024)))
+REQUEST_BODY_TIMEOUT = float(os.environ.get('REQUEST_BODY_TIMEOUT', '10'))  # seconds
+ROUTE_BODY_LIMITS = {
+    "/api/contact": 32 * 1024,  # 2000-char message fully \u-escaped, plus the frontend's extra fields
+    "/api/csrf-token": 1024,
+    "/api/session": 1024
+}
+# WebSocket messages are capped at 1000 chars - far below uvicorn's 16 MiB frame default
+WS_MAX_FRAME_BYTES = 64 * 1024
+
+# RESILIENCE: Handler deadlines (seconds to first response byte) - the task is cancelled and answered 504
+API_ROUTE_DEADLINE = float(os.environ.get('API_ROUTE_DEADLINE', '15'))
+ROUTE_DEADLINES = {
+    "/api/contact": float(os.environ.get('CONTACT_ROUTE_DEADLINE', '10')),
+    "/api/csrf-token": 2.0,
+    "/api/session": 5.0,
+    "/api/health": 5.0
+}
+
+# RESILIENCE: Per-endpoint bulkheads for DB-bound work
+CONTACT_BULKHEAD_LIMIT = int(os.environ.get('CONTACT_BULKHEAD_LIMIT', '20'))
+SECURITY_LOG_BULKHEAD_LIMIT = int(os.environ.get('SECURITY_LOG_BULKHEAD_LIMIT', '10'))
+ADMIN_BULKHEAD_LIMIT = int(os.environ.get('ADMIN_BULKHEAD_LIMIT', '4'))
+EXPORT_BULKHEAD_LIMIT = int(os.environ.get('EXPORT_BULKHEAD_LIMIT', '2'))  # each export pins a pool connection
+BULKHEAD_QUEUE_TIMEOUT = float(os.environ.get('BULKHEAD_QUEUE_TIMEOUT', '0.5'))  # seconds
+
+# RESILIENCE: Replay of contact submissions spooled while the DB was down
+SPOOL_REPLAY_INTERVAL = float(os.environ.get('CONTACT_SPOOL_REPLAY_INTERVAL', '15'))  # seconds
+SPOOL_REPLAY_BATCH_SIZE = 500
+
+# PERFORMANCE: Accept-and-queue contact pipeline - after the CSRF check the request
+# is queued and answered 202; consumers sanitize, validate and persist in batches.
+# Trade-off: a crash (not a graceful shutdown, which drains) loses queued leads.
+CONTACT_QUEUE_MODE = os.environ.get('CONTACT_QUEUE_MODE', 'false').lower() == 'true'
+CONTACT_QUEUE_SIZE = int(os.environ.get('CONTACT_QUEUE_SIZE', '1000'))
+CONTACT_QUEUE_CONSUMERS = int(os.environ.get('CONTACT_QUEUE_CONSUMERS', '2'))
+CONTACT_QUEUE_BATCH_SIZE = int(os.environ.get('CONTACT_QUEUE_BATCH_SIZE', '100'))
+CONTACT_QUEUE_DRAIN_TIMEOUT = float(os.environ.get('CONTACT_QUEUE_DRAIN_TIMEOUT', '10'))  # seconds
+contact_queue: asyncio.Queue = asyncio.Queue(maxsize=CONTACT_QUEUE_SIZE)
+contact_queue_state = {
+    "accepting": True,
+    "accepted": 0,
+    "rejected": 0,
+    "persisted": 0,
+    "spooled": 0,
+    "invalid": 0,
+    "lost": 0,
+    "batches": 0
+}
+
+# RETENTION: security_logs partition maintenance (create ahead, drop expired)
+SECURITY_LOG_MAINTENANCE_INTERVAL = float(os.environ.get('SECURITY_LOG_MAINTENANCE_INTERVAL', '3600'))  # seconds
+
+# PERFORMANCE: Security event rollups are flushed in batches, not per event
+ROLLUP_FLUSH_INTERVAL = float(os.environ.get('SECURITY_ROLLUP_FLUSH_INTERVAL', '5'))  # seconds
+# Longest range each timeseries interval may span (keeps chart responses to a few thousand buckets)
+TIMESERIES_MAX_RANGE = {
+    "minute": timedelta(days=3),
+    "hour": timedelta(days=90),
+    "day": timedelta(days=3650)
+}
+background_tasks = []
+
 def get_client_fingerprint(request: Request) -> str:
     """Generate secure client fingerprint to prevent IP spoofing"""
     client_ip = request.client.host if request.client else 'unknown'
@@ -63,6 +156,29 @@ def get_client_fingerprint(request: Request) -> str:
     fingerprint_data = f"{client_ip}:{user_agent[:50]}:{x_forwarded}"
     return hashlib.sha256(fingerprint_data.encode()).hexdigest()[:16]
 
+# SECURITY: Route-level patterns, compiled once at import
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+CLIENT_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{1,50}$')
+SAFE_PATH_PATTERN = re.compile(r'^[a-zA-Z0-9._/-]+$')
+
+# SECURITY: Request size limits, enforced by the pydantic-core validators below
+CONTACT_NAME_MAX_LENGTH = 100
+CONTACT_EMAIL_MAX_LENGTH = 255
+CONTACT_MESSAGE_MAX_LENGTH = 2000
+WS_MESSAGE_MAX_LENGTH = 1000
+WS_CONTENT_MAX_LENGTH = 500
+
+# PERFORMANCE: bleach's HTML5 tokenizer only ever changes text containing markup
+# characters (&, <, >), CR or C0 control characters - everything else comes back
+# untouched, so plain input skips the parser entirely (verified exhaustively
+# against bleach; see tests/test_sanitize.py)
+BLEACH_TRIGGER_PATTERN = re.compile(r'[\x00-\x08\x0b-\x1f&<>]')
+# Single-character patterns cannot interact with each other: one pass removes them all
+DANGEROUS_CHARS_PATTERN = re.compile(r'[${}]')
+# Multi-character patterns keep their order - removing one can form a later one
+DANGEROUS_SEQUENCES = ('..', '<script', 'javascript:', 'eval(')
+DANGEROUS_SEQUENCES_PATTERN = re.compile('|'.join(re.escape(pattern) for pattern in DANGEROUS_SEQUENCES))
+
 def sanitize_input(data: str, max_length: int = 1000) -> str:
     """Sanitize user input to prevent injection attacks"""
     if not data:
@@ -71,13 +187,17 @@ def sanitize_input(data: str, max_length: int = 1000) -> str:
     # Truncate to prevent buffer overflow
     data = data[:max_length]
     
-    # Remove dangerous characters and HTML
-    sanitized = bleach.clean(data, tags=[], attributes={}, strip=True)
+    # Remove dangerous characters and HTML (the parser only runs when it could change something)
+    if BLEACH_TRIGGER_PATTERN.search(data):
+        sanitized = bleach.clean(data, tags=[], attributes={}, strip=True)
+    else:
+        sanitized = data
     
     # Additional SQL/NoSQL injection prevention
-    dangerous_patterns = ['$', '{', '}', '..', '<script', 'javascript:', 'eval(']
-    for pattern in dangerous_patterns:
-        sanitized = sanitized.replace(pattern, '')
+    sanitized = DANGEROUS_CHARS_PATTERN.sub('', sanitized)
+    if DANGEROUS_SEQUENCES_PATTERN.search(sanitized):
+        for pattern in DANGEROUS_SEQUENCES:
+            sanitized = sanitized.replace(pattern, '')
     
     return sanitized.strip()
 
@@ -188,18 +308,406 @@ def validate_session(session_id: str, client_fingerprint: str) -> bool:
     session_data['last_activity'] = current_time
     return True
 
-async def log_security_event(event_type: str, details: dict, client_ip: str):
-    """Log security events to PostgreSQL database with proper error handling"""
+class BulkheadFull(Exception):
+    """Raised when a bulkhead slot cannot be acquired within the queue timeout"""
+    def __init__(self, name: str):
+        super().__init__(f"Bulkhead '{name}' is full")
+        self.name = name
+
+class Bulkhead:
+    """Async concurrency cap isolating DB-bound work from the rest of the app"""
+    def __init__(self, name: str, max_concurrent: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.completed = 0
+    
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one slot for the duration of the block, or raise BulkheadFull"""
+        if self.queue_timeout <= 0:
+            # No queueing: reject if full, otherwise acquire (a free slot never blocks)
+            if self._semaphore.locked():
+                self.rejected += 1
+                raise BulkheadFull(self.name)
+            await self._semaphore.acquire()
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise BulkheadFull(self.name)
+            finally:
+                self.waiting -= 1
+        
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+    
+    def stats(self) -> dict:
+        """Occupancy snapshot for health output"""
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "capacity": self.max_concurrent,
+            "rejected": self.rejected,
+            "completed": self.completed
+        }
+
+bulkheads = {
+    "contact": Bulkhead("contact", CONTACT_BULKHEAD_LIMIT, BULKHEAD_QUEUE_TIMEOUT),
+    "security_log": Bulkhead("security_log", SECURITY_LOG_BULKHEAD_LIMIT, BULKHEAD_QUEUE_TIMEOUT),
+    "admin": Bulkhead("admin", ADMIN_BULKHEAD_LIMIT, BULKHEAD_QUEUE_TIMEOUT),
+    "export": Bulkhead("export", EXPORT_BULKHEAD_LIMIT, BULKHEAD_QUEUE_TIMEOUT),
+}
+
+# PERFORMANCE: Idempotent contact submissions - client retries are answered from
+# memory before CSRF validation, sanitizing or the database are touched
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '10000'))
+IDEMPOTENCY_TTL = float(os.environ.get('IDEMPOTENCY_TTL', '86400'))  # seconds
+IDEMPOTENCY_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{8,128}$')
+
+class IdempotencyCache:
+    """Bounded LRU of recent responses keyed by idempotency key, with a TTL
+
+    Concurrent requests with the same key wait for the first one to finish
+    instead of racing it to the database.
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, payload_hash, response)
+        self._in_flight: dict = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[tuple]:
+        """(payload_hash, response) for a live key, else None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload_hash, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload_hash, response
+    
+    def put(self, key: str, payload_hash: str, response: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, payload_hash, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    @asynccontextmanager
+    async def claim(self, key: str):
+        """Serialize requests sharing a key; yields the cached entry if one appears"""
+        while key in self._in_flight:
+            await asyncio.shield(self._in_flight[key])
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            yield cached
+            return
+        self.misses += 1
+        done = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = done
+        try:
+            yield None
+        finally:
+            del self._in_flight[key]
+            done.set_result(None)
+    
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+idempotency_cache = IdempotencyCache(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL)
+
+def contact_idempotency_key(request: Request, form_data, client_fingerprint: str) -> tuple:
+    """(storage key, payload hash) for a contact submission
+
+    Uses the client's Idempotency-Key (header or form field) when given,
+    otherwise fingerprint + content within the TTL window, so identical
+    resubmissions collapse without any client support. Keys are namespaced
+    by fingerprint so one client can never hit another's entries.
+    """
+    payload_hash = hashlib.sha256(
+        f"{form_data.name}\0{form_data.email}\0{form_data.message}".encode()
+    ).hexdigest()
+    client_key = request.headers.get('idempotency-key') or form_data.idempotency_key
+    if client_key:
+        if not IDEMPOTENCY_KEY_PATTERN.match(client_key):
+            raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+        source = f"key\0{client_fingerprint}\0{client_key}"
+    else:
+        window = int(time.time() // IDEMPOTENCY_TTL)
+        source = f"content\0{client_fingerprint}\0{window}\0{payload_hash}"
+    return hashlib.sha256(source.encode()).hexdigest(), payload_hash
+
+async def log_security_event(event_type: str, details: dict, client_ip: str, durability: Optional[str] = None):
+    """Log security events to PostgreSQL database with proper error handling
+
+    durability overrides the security_logs tier (async commit by default).
+    """
     if not DATABASE_CONNECTED:
         logger.warning(f"Security event not logged - DB unavailable: {event_type}")
         return
     
     try:
         severity = "high" if event_type in ["rate_limit_exceeded", "circuit_breaker"] else "medium"
-        await insert_security_log(event_type, client_ip, details, severity)
+        async with bulkheads["security_log"].slot():
+            await insert_security_log(event_type, client_ip, details, severity, durability)
+    except BulkheadFull:
+        # Dropping an audit row beats queueing behind a slow database
+        logger.warning(f"Security event dropped - bulkhead full: {event_type}")
+    except DatabaseUnavailable:
+        logger.warning(f"Security event not logged - DB circuit open: {event_type}")
     except Exception as e:
         logger.error(f"Failed to log security event: {e}")
 
+async def database_supervisor():
+    """Connect in the background with exponential backoff and reconnect on loss"""
+    global DATABASE_CONNECTED
+    delay = DB_CONNECT_BACKOFF_BASE
+    
+    while True:
+        if not DATABASE_CONNECTED:
+            database_state["state"] = "connecting" if database_state["time_to_ready"] is None else "reconnecting"
+            database_state["attempts"] += 1
+            try:
+                await db_manager.connect()
+                database_state["schema"] = await db_manager.check_schema()
+            except Exception as e:
+                database_state["last_error"] = type(e).__name__
+                logger.warning(f"💾 PostgreSQL connection attempt {database_state['attempts']} failed - {e}")
+                if db_manager.is_connected:
+                    await db_manager.disconnect()
+                # Jittered backoff so a fleet of cold instances does not reconnect in lockstep
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+                delay = min(delay * 2, DB_CONNECT_BACKOFF_MAX)
+                continue
+            
+            DATABASE_CONNECTED = True
+            delay = DB_CONNECT_BACKOFF_BASE
+            database_state["state"] = "connected"
+            database_state["last_error"] = None
+            if database_state["time_to_ready"] is None:
+                database_state["time_to_ready"] = round(time.monotonic() - PROCESS_START_TIME, 3)
+            logger.info(f"💾 PostgreSQL database: Ready with connection pooling (attempt {database_state['attempts']})")
+        
+        await asyncio.sleep(DB_HEALTH_CHECK_INTERVAL)
+        if await db_manager.ping(timeout=DB_HEALTH_CHECK_INTERVAL / 2):
+            database_state["health_check_failures"] = 0
+            continue
+        # One missed check is often a slow network round trip; only a run of them means the server is gone
+        database_state["health_check_failures"] += 1
+        failures = database_state["health_check_failures"]
+        if failures < DB_HEALTH_FAILURE_THRESHOLD:
+            logger.warning(f"💾 PostgreSQL health check failed ({failures}/{DB_HEALTH_FAILURE_THRESHOLD})")
+        else:
+            logger.warning("💾 PostgreSQL health check failed - reconnecting")
+            DATABASE_CONNECTED = False
+            database_state["health_check_failures"] = 0
+            database_state["state"] = "reconnecting"
+            try:
+                await db_manager.disconnect()
+            except Exception as e:
+                logger.warning(f"Error dropping stale database pool: {e}")
+
+async def replay_contact_spool() -> int:
+    """Replay sealed spool segments into PostgreSQL, returning records replayed"""
+    await contact_spool.rotate()
+    loop = asyncio.get_running_loop()
+    replayed = 0
+    
+    for segment in contact_spool.pending_segments():
+        records, complete = await loop.run_in_executor(None, read_segment, segment)
+        # Spooled ids are idempotency keys - a repeated replay skips rows already stored
+        replayed += await bulk_ingest(
+            'contact_submissions', records, batch_size=SPOOL_REPLAY_BATCH_SIZE, skip_existing=True
+        )
+        # Only drop the segment once every batch is committed - and never one whose
+        # read stopped early, since bytes past the damage may still hold leads
+        if complete:
+            await loop.run_in_executor(None, os.remove, segment)
+        else:
+            quarantined = await loop.run_in_executor(None, contact_spool.quarantine, segment)
+            logger.error(f"🚨 Contact spool segment damaged after {len(records)} records - kept as {quarantined}")
+    
+    return replayed
+
+def prepare_queued_contact(item: dict) -> Optional[dict]:
+    """Sanitize and validate one queued submission into a contact_submissions record"""
+    email = sanitize_input(item["email"], CONTACT_EMAIL_MAX_LENGTH)
+    if not EMAIL_PATTERN.match(email):
+        return None
+    return {
+        "id": item["id"],
+        "name": sanitize_input(item["name"], CONTACT_NAME_MAX_LENGTH),
+        "email": email,
+        "message": sanitize_input(item["message"], CONTACT_MESSAGE_MAX_LENGTH),
+        "client_fingerprint": item["client_fingerprint"],
+        "status": "new",
+        "idempotency_key": item["idempotency_key"],
+        "submitted_at": item["submitted_at"]
+    }
+
+async def persist_contact_batch(batch: list):
+    """Sanitize, validate and store a batch: one COPY for the rows, one for their audit events"""
+    records = []
+    client_ips = {}
+    for item in batch:
+        record = prepare_queued_contact(item)
+        if record is None:
+            contact_queue_state["invalid"] += 1
+            logger.warning(f"Queued contact submission {item['id']} rejected - invalid email")
+        else:
+            records.append(record)
+            client_ips[record["id"]] = item["client_ip"]
+    if not records:
+        return
+    
+    if DATABASE_CONNECTED:
+        try:
+            async with bulkheads["contact"].slot():
+                await bulk_ingest('contact_submissions', records, skip_existing=True)
+            contact_queue_state["persisted"] += len(records)
+            events = [{
+                "event_type": "contact_form_submitted",
+                "client_ip": client_ips[record["id"]],
+                "details": {"submission_id": record["id"]},
+                "severity": "medium"
+            } for record in records]
+            try:
+                await bulk_ingest('security_logs', events)
+            except Exception as e:
+                logger.warning(f"Contact audit events not logged: {e}")
+            return
+        except Exception as e:
+            logger.warning(f"Queued contact batch diverted to spool - {e}")
+    
+    # RESILIENCE: Same fallback as the inline path - one group-committed fsync for the batch
+    if contact_spool.is_open:
+        results = await asyncio.gather(*(contact_spool.append(r) for r in records), return_exceptions=True)
+        failed = sum(1 for result in results if isinstance(result, Exception))
+    else:
+        failed = len(records)
+    contact_queue_state["spooled"] += len(records) - failed
+    contact_queue_state["lost"] += failed
+    if failed:
+        logger.error(f"{failed} contact submissions lost (DB and spool unavailable)")
+
+async def contact_queue_consumer():
+    """Take whatever has queued up (up to a batch) and persist it together"""
+    while True:
+        batch = [await contact_queue.get()]
+        # No timer: while a batch is being written, the next one accumulates
+        while len(batch) < CONTACT_QUEUE_BATCH_SIZE:
+            try:
+                batch.append(contact_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            await persist_contact_batch(batch)
+            contact_queue_state["batches"] += 1
+        except Exception as e:
+            logger.error(f"Contact queue batch failed: {e}")
+        finally:
+            for _ in batch:
+                contact_queue.task_done()
+
+async def drain_contact_queue():
+    """Stop admitting and wait for consumers to persist everything already accepted"""
+    contact_queue_state["accepting"] = False
+    try:
+        await asyncio.wait_for(contact_queue.join(), timeout=CONTACT_QUEUE_DRAIN_TIMEOUT)
+        logger.info("📨 Contact queue drained")
+    except asyncio.TimeoutError:
+        logger.error(f"📨 Contact queue drain timed out with {contact_queue.qsize()} submissions pending")
+
+async def contact_spool_replayer():
+    """Background loop draining the contact spool whenever the database is usable"""
+    while True:
+        await asyncio.sleep(SPOOL_REPLAY_INTERVAL)
+        if not DATABASE_CONNECTED or db_breaker.state == db_breaker.OPEN:
+            continue
+        try:
+            replayed = await replay_contact_spool()
+            if replayed:
+                logger.info(f"📨 Replayed {replayed} spooled contact submissions")
+        except Exception as e:
+            logger.warning(f"Contact spool replay failed: {e}")
+
+# Last maintenance outcome, for the health endpoint
+partition_state = {"failed": {}, "default_rows": {}, "checked_at": None}
+
+async def security_log_partition_maintainer():
+    """Keep future security_logs partitions in place and drop expired ones"""
+    while True:
+        if not DATABASE_CONNECTED:
+            await asyncio.sleep(5)
+            continue
+        try:
+            if await is_security_logs_partitioned():
+                created, failed = await ensure_security_log_partitions()
+                if created:
+                    logger.info(f"🗂️ Created security_logs partitions: {', '.join(created)}")
+                default_rows = await count_default_partition_rows()
+                partition_state.update(failed=failed, default_rows=default_rows, checked_at=int(time.time()))
+                if default_rows:
+                    # Rows here escape retention - an operator has to move them into daily partitions
+                    logger.warning(f"🗂️ security_logs DEFAULT partition holds rows for days: {default_rows}")
+                if SECURITY_LOG_RETENTION_DAYS > 0:
+                    cutoff = datetime.now(timezone.utc).date() - timedelta(days=SECURITY_LOG_RETENTION_DAYS)
+                    dropped = await drop_security_log_partitions(cutoff)
+                    if dropped:
+                        logger.info(f"🗂️ Dropped expired security_logs partitions: {', '.join(dropped)}")
+        except Exception as e:
+            logger.warning(f"security_logs partition maintenance failed: {e}")
+        await asyncio.sleep(SECURITY_LOG_MAINTENANCE_INTERVAL)
+
+async def security_rollup_flusher():
+    """Periodically upsert accumulated per-minute security event counts"""
+    while True:
+        await asyncio.sleep(ROLLUP_FLUSH_INTERVAL)
+        if not DATABASE_CONNECTED:
+            continue
+        try:
+            await security_event_rollup.flush()
+        except Exception as e:
+            logger.warning(f"Security event rollup flush failed: {e}")
+
+async def require_admin(request: Request):
+    """Dependency guarding admin endpoints with a constant-time bearer token check"""
+    if not ADMIN_API_TOKEN:
+        # Admin API is off unless explicitly configured
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), ADMIN_API_TOKEN.encode()):
+        # Rare and worth keeping through a crash - wait for the WAL flush
+        await log_security_event(
+            "admin_auth_failed",
+            {"path": request.url.path, "fingerprint": get_client_fingerprint(request)},
+            request.client.host if request.client else 'unknown',
+            durability=DURABILITY_DURABLE
+        )
+        raise HTTPException(status_code=401, detail="Unauthorized", headers={"WWW-Authenticate": "Bearer"})
+
+def require_database():
+    """Dependency failing fast when admin reads cannot reach PostgreSQL"""
+    if not DATABASE_CONNECTED:
+        raise HTTPException(status_code=503, detail="Database unavailable", headers={"Retry-After": "30"})
+
 def is_safe_path(path: str) -> bool:
     """Validate file path for security"""
     if not path:
@@ -211,8 +719,7 @@ def is_safe_path(path: str) -> bool:
         return False
     
     # Validate against allowed file extensions and patterns
-    safe_pattern = re.compile(r'^[a-zA-Z0-9._/-]+$')
-    return bool(safe_pattern.match(path)) and len(path) < 255
+    return len(path) < 255 and bool(SAFE_PATH_PATTERN.match(path))
 
 # SECURITY: Secure cached file existence check with path validation
 @lru_cache(maxsize=128)
@@ -261,10 +768,29 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "Internal server error", "error_id": str(int(time.time()))}
     )
 
+@app.exception_handler(BulkheadFull)
+async def bulkhead_full_handler(request: Request, exc: BulkheadFull):
+    # PERFORMANCE: Fail fast instead of queueing behind a saturated database
+    logger.warning(f"{exc} - rejecting {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable"},
+        headers={"Retry-After": "5"}
+    )
+
+@app.exception_handler(DatabaseUnavailable)
+async def database_unavailable_handler(request: Request, exc: DatabaseUnavailable):
+    # RESILIENCE: Breaker is open - answer without touching the database
+    logger.warning(f"{exc} - rejecting {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database unavailable"},
+        headers={"Retry-After": "30"}
+    )
+
 @app.on_event("startup")
 async def startup_event():
     """Async startup with comprehensive validation"""
-    global DATABASE_CONNECTED
     logger.info("🚀 Copperhead Consulting API starting up...")
     
     # PERFORMANCE: Async file system checks
@@ -276,22 +802,27 @@ async def startup_event():
             None, cached_file_exists, frontend_dist_path
         )
         logger.info(f"📂 Frontend available: {frontend_exists}")
-        
-        # Initialize PostgreSQL database connection
-        try:
-            await db_manager.connect()
-            await db_manager.create_tables()
-            DATABASE_CONNECTED = True
-            logger.info("💾 PostgreSQL database: Ready with connection pooling")
-            
-        except Exception as db_error:
-            logger.warning(f"💾 PostgreSQL connection: Failed - {db_error}")
-            DATABASE_CONNECTED = False
-            # Graceful degradation - app continues without database
-        
     except Exception as e:
         logger.warning(f"Startup validation failed: {e}")
     
+    # PERFORMANCE: Serve immediately - the supervisor connects (and reconnects) in the background
+    background_tasks.append(asyncio.create_task(database_supervisor()))
+    background_tasks.append(asyncio.create_task(security_log_partition_maintainer()))
+    background_tasks.append(asyncio.create_task(security_rollup_flusher()))
+    
+    if CONTACT_QUEUE_MODE:
+        for _ in range(CONTACT_QUEUE_CONSUMERS):
+            background_tasks.append(asyncio.create_task(contact_queue_consumer()))
+        logger.info(f"📨 Contact queue mode: {CONTACT_QUEUE_CONSUMERS} consumers, capacity {CONTACT_QUEUE_SIZE}")
+    
+    # RESILIENCE: Local spool keeps contact leads while the database is down
+    try:
+        contact_spool.open()
+        background_tasks.append(asyncio.create_task(contact_spool_replayer()))
+        logger.info(f"📨 Contact spool ready at {contact_spool.directory}")
+    except OSError as e:
+        logger.warning(f"📨 Contact spool unavailable - {e}")
+    
     logger.info(f"🌍 Environment: {os.environ.get('ENVIRONMENT', 'production')}")
     logger.info("✅ Startup complete - ready to serve requests")
 
@@ -300,6 +831,26 @@ async def shutdown_event():
     """Graceful shutdown with database cleanup"""
     logger.info("🔄 Shutting down gracefully...")
     
+    # Accepted submissions are persisted while the DB and spool are still open
+    if CONTACT_QUEUE_MODE:
+        await drain_contact_queue()
+    
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    
+    try:
+        contact_spool.close()
+    except OSError as e:
+        logger.error(f"Error closing contact spool: {e}")
+    
+    if DATABASE_CONNECTED:
+        try:
+            await security_event_rollup.flush()
+        except Exception as e:
+            logger.error(f"Error flushing security event rollups: {e}")
+    
     try:
         await db_manager.disconnect()
         logger.info("💾 PostgreSQL database connections closed")
@@ -363,22 +914,24 @@ async def security_and_logging_middleware(request: Request, call_next):
             )
         
         # Individual client rate limiting
-        if len(client_requests) >= RATE_LIMIT_REQUESTS:
-            # Log security event
-            await log_security_event(
-                "rate_limit_exceeded", 
-                {"requests": len(client_requests), "fingerprint": client_fingerprint},
-                client_ip
-            )
-            return JSONResponse(
-                status_code=429,
-                content={"detail": "Rate limit exceeded"},
-                headers={"Retry-After": "60"}
-            )
-        
-        client_requests.append(current_time)
-        # Move to end for LRU ordering
-        rate_limit_storage.move_to_end(client_fingerprint)
+        rate_limited_count = len(client_requests) if len(client_requests) >= RATE_LIMIT_REQUESTS else 0
+        if not rate_limited_count:
+            client_requests.append(current_time)
+            # Move to end for LRU ordering
+            rate_limit_storage.move_to_end(client_fingerprint)
+    
+    if rate_limited_count:
+        # Log security event outside the lock - the bulkhead may make us wait
+        await log_security_event(
+            "rate_limit_exceeded", 
+            {"requests": rate_limited_count, "fingerprint": client_fingerprint},
+            client_ip
+        )
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Rate limit exceeded"},
+            headers={"Retry-After": "60"}
+        )
     # Optimized logging - only log errors and important events
     if request.url.path.startswith("/api") or request.method != "GET":
         logger.info(f"🌐 {request.method} {request.url.path} from {client_ip}")
@@ -436,7 +989,22 @@ app.add_middleware(
     ],
     allow_credentials=False,  # SECURITY: Disabled credentials for wildcard protection
     allow_methods=["GET", "POST", "HEAD", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "X-Requested-With"],  # SECURITY: Restricted headers
+    allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Idempotency-Key"],  # SECURITY: Restricted headers
+)
+
+# RESILIENCE: Deadlines cover rate limiting, CORS, reading the body and the handler
+app.add_middleware(
+    RouteDeadlineMiddleware,
+    default_deadline=API_ROUTE_DEADLINE,
+    route_deadlines=ROUTE_DEADLINES
+)
+
+# SECURITY: Outermost layer - oversized or slow bodies are refused before rate limiting or routing
+app.add_middleware(
+    RequestLimitsMiddleware,
+    max_body_bytes=MAX_REQUEST_BODY_BYTES,
+    body_timeout=REQUEST_BODY_TIMEOUT,
+    route_limits=ROUTE_BODY_LIMITS
 )
 
 @app.options("/{full_path:path}")
@@ -479,7 +1047,28 @@ async def api_health_check():
         "timestamp": int(time.time()),
         "components": {
             "api": "healthy",
-            "frontend": "available" if frontend_available else "unavailable"
+            "frontend": "available" if frontend_available else "unavailable",
+            "database": {"connected": DATABASE_CONNECTED, **database_state},
+            "database_breaker": db_breaker.stats(),
+            "database_pool": db_manager.pool_stats(),
+            "contact_spool": contact_spool.stats(),
+            "bulkheads": {name: bulkhead.stats() for name, bulkhead in bulkheads.items()},
+            "idempotency_cache": idempotency_cache.stats(),
+            "security_log_partitions": partition_state,
+            "request_limits": request_limit_stats,
+            "route_deadlines": route_deadline_stats,
+            "contact_queue": {
+                "enabled": CONTACT_QUEUE_MODE,
+                "depth": contact_queue.qsize(),
+                "capacity": CONTACT_QUEUE_SIZE,
+                **contact_queue_state
+            },
+            "security_rollups": {
+                "pending_buckets": security_event_rollup.pending,
+                "flushed_rows": security_event_rollup.flushed_rows,
+                "dropped_events": security_event_rollup.dropped_events,
+                "unknown_events": security_event_rollup.unknown_events
+            }
         }
     }
 
@@ -508,17 +1097,63 @@ async def create_session(request: Request):
     }
 
 # SECURITY: Contact form with CSRF protection
+# PERFORMANCE: Limits are checked by the compiled validator, so an oversized or
+# non-string field is a 422 before bleach or any handler code sees it
 class ContactForm(BaseModel):
-    name: str
-    email: str
-    message: str
-    csrf_token: str
+    name: Annotated[str, StringConstraints(strict=True, strip_whitespace=True, min_length=1,
+                                           max_length=CONTACT_NAME_MAX_LENGTH)]
+    email: Annotated[str, StringConstraints(strict=True, strip_whitespace=True, max_length=CONTACT_EMAIL_MAX_LENGTH,
+                                            pattern=EMAIL_PATTERN.pattern)]
+    message: Annotated[str, StringConstraints(strict=True, strip_whitespace=True, min_length=1,
+                                              max_length=CONTACT_MESSAGE_MAX_LENGTH)]
+    csrf_token: Annotated[str, StringConstraints(strict=True, max_length=256)]
+    idempotency_key: Optional[Annotated[str, StringConstraints(strict=True, max_length=128)]] = None
 
 @app.post("/api/contact")
 async def submit_contact_form(form_data: ContactForm, request: Request):
     """Secure contact form submission with CSRF protection"""
     client_fingerprint = get_client_fingerprint(request)
+    idempotency_key, payload_hash = contact_idempotency_key(request, form_data, client_fingerprint)
+    
+    async with idempotency_cache.claim(idempotency_key) as cached:
+        if cached is not None:
+            original_hash, (status_code, content) = cached
+            if original_hash != payload_hash:
+                raise HTTPException(status_code=422, detail="Idempotency-Key reused with a different submission")
+            return JSONResponse(status_code=status_code, content=content, headers={"Idempotent-Replayed": "true"})
+        
+        status_code, content = await process_contact_submission(form_data, request, client_fingerprint, idempotency_key)
+        idempotency_cache.put(idempotency_key, payload_hash, (status_code, content))
+        return JSONResponse(status_code=status_code, content=content)
+
+def enqueue_contact_submission(form_data: ContactForm, request: Request,
+                               client_fingerprint: str, idempotency_key: str) -> tuple:
+    """Admit a submission to the work queue and answer 202, or 503 when full"""
+    if not contact_queue_state["accepting"]:
+        raise HTTPException(status_code=503, detail="Server is shutting down", headers={"Retry-After": "5"})
     
+    submission_id = str(uuid7())
+    try:
+        contact_queue.put_nowait({
+            "id": submission_id,
+            "name": form_data.name,
+            "email": form_data.email,
+            "message": form_data.message,
+            "client_fingerprint": client_fingerprint,
+            "client_ip": request.client.host if request.client else 'unknown',
+            "idempotency_key": idempotency_key,
+            "submitted_at": datetime.now(timezone.utc).isoformat()
+        })
+    except asyncio.QueueFull:
+        contact_queue_state["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Contact queue full", headers={"Retry-After": "5"})
+    
+    contact_queue_state["accepted"] += 1
+    return 202, {"status": "accepted", "message": "Contact form received", "submission_id": submission_id}
+
+async def process_contact_submission(form_data: ContactForm, request: Request,
+                                     client_fingerprint: str, idempotency_key: str) -> tuple:
+    """Validate, sanitize and persist one contact submission, returning (status code, body)"""
     # Validate CSRF token
     if not validate_csrf_token(form_data.csrf_token, client_fingerprint):
         await log_security_event(
@@ -528,14 +1163,16 @@ async def submit_contact_form(form_data: ContactForm, request: Request):
         )
         raise HTTPException(status_code=403, detail="Invalid CSRF token")
     
+    if CONTACT_QUEUE_MODE:
+        return enqueue_contact_submission(form_data, request, client_fingerprint, idempotency_key)
+    
     # Sanitize inputs
-    name = sanitize_input(form_data.name, 100)
-    email = sanitize_input(form_data.email, 255)
-    message = sanitize_input(form_data.message, 2000)
+    name = sanitize_input(form_data.name, CONTACT_NAME_MAX_LENGTH)
+    email = sanitize_input(form_data.email, CONTACT_EMAIL_MAX_LENGTH)
+    message = sanitize_input(form_data.message, CONTACT_MESSAGE_MAX_LENGTH)
     
-    # Validate email format
-    email_pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-    if not email_pattern.match(email):
+    # Re-check email format - sanitizing can remove characters
+    if not EMAIL_PATTERN.match(email):
         raise HTTPException(status_code=400, detail="Invalid email format")
     
     # Store in PostgreSQL database if available
@@ -546,10 +1183,12 @@ async def submit_contact_form(form_data: ContactForm, request: Request):
                 "email": email,
                 "message": message,
                 "client_fingerprint": client_fingerprint,
-                "status": "new"
+                "status": "new",
+                "idempotency_key": idempotency_key
             }
             
-            submission_id = await insert_contact_submission(submission_data)
+            async with bulkheads["contact"].slot():
+                submission_id = await insert_contact_submission(submission_data)
             
             # Log successful submission
             await log_security_event(
@@ -558,15 +1197,202 @@ async def submit_contact_form(form_data: ContactForm, request: Request):
                 request.client.host if request.client else 'unknown'
             )
             
-            return {"status": "success", "message": "Contact form submitted successfully"}
+            return 200, {"status": "success", "message": "Contact form submitted successfully"}
             
+        except BulkheadFull:
+            raise
+        except DatabaseUnavailable:
+            # RESILIENCE: Breaker is open - skip the doomed DB round trip entirely
+            logger.warning("Contact submission diverted to fallback - database circuit open")
+        except RETRYABLE_DB_ERRORS as e:
+            # RESILIENCE: DB is failing but the breaker has not tripped yet - still keep the lead.
+            # If the insert did commit, the idempotency key makes the replayed copy a no-op
+            logger.warning(f"Contact submission diverted to fallback - database error: {e}")
         except Exception as e:
             logger.error(f"Failed to store contact submission: {e}")
             raise HTTPException(status_code=500, detail="Failed to process submission")
-    else:
-        # Fallback when database is unavailable
-        logger.info(f"Contact form submission (DB unavailable): {name} <{email}>")
-        return {"status": "success", "message": "Contact form received"}
+    
+    # Fallback when database is unavailable - spool the lead for later replay
+    if contact_spool.is_open:
+        try:
+            await contact_spool.append({
+                "id": str(uuid7()),
+                "name": name,
+                "email": email,
+                "message": message,
+                "client_fingerprint": client_fingerprint,
+                "status": "new",
+                "idempotency_key": idempotency_key,
+                "submitted_at": datetime.now(timezone.utc).isoformat()
+            })
+            logger.info("Contact form submission spooled (DB unavailable)")
+            return 200, {"status": "success", "message": "Contact form received"}
+        except OSError as e:
+            logger.error(f"Failed to spool contact submission: {e}")
+    
+    logger.info(f"Contact form submission (DB unavailable): {name} <{email}>")
+    return 200, {"status": "success", "message": "Contact form received"}
+
+# ADMIN: Keyset-paginated contact submission listing
+@app.get("/api/admin/contact-submissions", dependencies=[Depends(require_admin), Depends(require_database)])
+async def admin_list_contact_submissions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, max_length=512),
+    status: Optional[str] = Query(None, max_length=20),
+    email: Optional[str] = Query(None, max_length=255)
+):
+    """Newest-first contact submissions; pass next_cursor back to fetch the next page"""
+    try:
+        async with bulkheads["admin"].slot():
+            items, next_cursor = await list_contact_submissions(limit, cursor, status, email)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return {"items": items, "next_cursor": next_cursor}
+
+# ADMIN: Full-text search over contact submission messages
+@app.get("/api/admin/contact-submissions/search", dependencies=[Depends(require_admin), Depends(require_database)])
+async def admin_search_contact_submissions(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    status: Optional[str] = Query(None, max_length=20)
+):
+    """Ranked message search with highlighted snippets (web-search syntax: "quotes", or, -exclude)"""
+    async with bulkheads["admin"].slot():
+        items = await search_contact_submissions(q, limit, status)
+    
+    return {"items": items}
+
+# ADMIN: Security log search (event type, severity, time range, IP/CIDR, details containment)
+@app.get("/api/admin/security-logs", dependencies=[Depends(require_admin), Depends(require_database)])
+async def admin_search_security_logs(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, max_length=512),
+    event_type: Optional[str] = Query(None, max_length=50),
+    severity: Optional[str] = Query(None, max_length=20),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    ip: Optional[str] = Query(None, max_length=64, description="IP address or CIDR block"),
+    details: Optional[str] = Query(None, max_length=2000, description='JSON object, e.g. {"fingerprint": "..."}')
+):
+    """Newest-first security events; pass next_cursor back to fetch the next page"""
+    network = None
+    if ip is not None:
+        try:
+            network = str(ipaddress.ip_network(ip, strict=False))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid IP address or CIDR block")
+    
+    details_filter = None
+    if details is not None:
+        try:
+            details_filter = json.loads(details)
+        except json.JSONDecodeError:
+            details_filter = None
+        if not isinstance(details_filter, dict):
+            raise HTTPException(status_code=400, detail="details must be a JSON object")
+    
+    try:
+        async with bulkheads["admin"].slot():
+            items, next_cursor = await search_security_logs(
+                limit, cursor, event_type, severity, since, until, network, details_filter
+            )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return {"items": items, "next_cursor": next_cursor}
+
+# ADMIN: Security event counts over time, served from the per-minute rollup table
+@app.get("/api/admin/security-events/timeseries", dependencies=[Depends(require_admin), Depends(require_database)])
+async def admin_security_event_timeseries(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    interval: str = Query("minute", pattern="^(minute|hour|day)$"),
+    event_type: Optional[str] = Query(None, max_length=50),
+    severity: Optional[str] = Query(None, max_length=20)
+):
+    """Event counts per bucket; defaults to the last 24 hours"""
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(hours=24)
+    since, until = as_utc(since), as_utc(until)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if until - since > TIMESERIES_MAX_RANGE[interval]:
+        raise HTTPException(status_code=400, detail=f"Range too large for {interval} buckets")
+    
+    async with bulkheads["admin"].slot():
+        points = await security_event_timeseries(since, until, interval, event_type, severity)
+    
+    return {"interval": interval, "since": since, "until": until, "points": points}
+
+# ADMIN: Per-statement latency histograms, pool waits and sampled slow-query plans
+@app.get("/api/admin/db-stats", dependencies=[Depends(require_admin)])
+async def admin_database_stats():
+    """In-process query instrumentation snapshot (no database round trip)"""
+    return {
+        "breaker": db_breaker.stats(),
+        **db_manager.database.stats()
+    }
+
+# ADMIN: Streaming exports (CSV/NDJSON, optional gzip) with constant memory
+async def export_stream(table_name: str, export_format: str, since: Optional[datetime],
+                        until: Optional[datetime], compress: bool):
+    """Encoded export chunks; the export bulkhead slot is held until the stream ends"""
+    async with bulkheads["export"].slot():
+        rows = iterate_export(table_name, since, until)
+        async for chunk in encode_export(rows, export_format, export_columns(table_name), compress):
+            yield chunk
+
+async def streaming_export_response(table_name: str, export_format: str, since: Optional[datetime],
+                                    until: Optional[datetime], compress: bool) -> StreamingResponse:
+    stream = export_stream(table_name, export_format, since, until, compress)
+    # Pull the first chunk here so a full bulkhead or an unreachable database
+    # still becomes a proper error status instead of a truncated 200
+    try:
+        first_chunk = await stream.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b""
+    
+    async def body():
+        yield first_chunk
+        async for chunk in stream:
+            yield chunk
+    
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    filename = f"{table_name.replace('_', '-')}-{stamp}.{export_format}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "X-Content-Type-Options": "nosniff"
+        }
+    )
+
+@app.get("/api/admin/export/contact-submissions", dependencies=[Depends(require_admin), Depends(require_database)])
+async def admin_export_contact_submissions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gzip: bool = False
+):
+    """Stream contact submissions oldest-first as CSV or NDJSON"""
+    return await streaming_export_response("contact_submissions", format, since, until, gzip)
+
+@app.get("/api/admin/export/security-logs", dependencies=[Depends(require_admin), Depends(require_database)])
+async def admin_export_security_logs(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gzip: bool = False
+):
+    """Stream security events oldest-first as CSV or NDJSON"""
+    return await streaming_export_response("security_logs", format, since, until, gzip)
 
 # SECURITY: WebSocket connection manager with rate limiting
 class WebSocketManager:
@@ -652,12 +1478,16 @@ class WebSocketManager:
 
 websocket_manager = WebSocketManager()
 
+class WebSocketMessage(BaseModel):
+    type: Annotated[str, StringConstraints(strict=True, min_length=1, max_length=32)]
+    content: Annotated[str, StringConstraints(strict=True, max_length=WS_CONTENT_MAX_LENGTH)] = ''
+
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     """Secure WebSocket endpoint with authentication and rate limiting"""
-    # Sanitize client_id
+    # Sanitize client_id (truncating, as before) then validate it
     client_id = sanitize_input(client_id, 50)
-    if not client_id or not re.match(r'^[a-zA-Z0-9_-]+$', client_id):
+    if not CLIENT_ID_PATTERN.match(client_id):
         await websocket.close(code=1008, reason="Invalid client ID")
         return
     
@@ -678,47 +1508,44 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 }))
                 continue
             
-            # Sanitize incoming message
-            sanitized_data = sanitize_input(data, 1000)
+            if len(data) > WS_MESSAGE_MAX_LENGTH:
+                await websocket.send_text(json.dumps({
+                    "error": "Message too large",
+                    "code": "MESSAGE_TOO_LARGE"
+                }))
+                continue
             
+            # PERFORMANCE: Parse and validate in one pass in pydantic-core; fields
+            # are sanitized individually, never the raw JSON text
             try:
-                message_data = json.loads(sanitized_data)
-                
-                # Validate message structure
-                if not isinstance(message_data, dict) or 'type' not in message_data:
-                    await websocket.send_text(json.dumps({
-                        "error": "Invalid message format",
-                        "code": "INVALID_FORMAT"
-                    }))
-                    continue
-                
-                # Process different message types
-                message_type = message_data.get('type')
-                
-                if message_type == 'ping':
-                    await websocket.send_text(json.dumps({
-                        "type": "pong",
-                        "timestamp": int(time.time())
-                    }))
-                
-                elif message_type == 'echo':
-                    content = sanitize_input(message_data.get('content', ''), 500)
-                    await websocket.send_text(json.dumps({
-                        "type": "echo_response",
-                        "content": content,
-                        "timestamp": int(time.time())
-                    }))
-                
-                else:
-                    await websocket.send_text(json.dumps({
-                        "error": "Unknown message type",
-                        "code": "UNKNOWN_TYPE"
-                    }))
-                
-            except json.JSONDecodeError:
+                message_data = WebSocketMessage.model_validate_json(data)
+            except ValidationError as e:
+                invalid_json = any(error["type"] == "json_invalid" for error in e.errors())
+                await websocket.send_text(json.dumps({
+                    "error": "Invalid JSON" if invalid_json else "Invalid message format",
+                    "code": "INVALID_JSON" if invalid_json else "INVALID_FORMAT"
+                }))
+                continue
+            
+            # Process different message types
+            if message_data.type == 'ping':
+                await websocket.send_text(json.dumps({
+                    "type": "pong",
+                    "timestamp": int(time.time())
+                }))
+            
+            elif message_data.type == 'echo':
+                content = sanitize_input(message_data.content, WS_CONTENT_MAX_LENGTH)
+                await websocket.send_text(json.dumps({
+                    "type": "echo_response",
+                    "content": content,
+                    "timestamp": int(time.time())
+                }))
+            
+            else:
                 await websocket.send_text(json.dumps({
-                    "error": "Invalid JSON",
-                    "code": "INVALID_JSON"
+                    "error": "Unknown message type",
+                    "code": "UNKNOWN_TYPE"
                 }))
                 
     except WebSocketDisconnect:
@@ -853,5 +1680,6 @@ if __name__ == "__main__":
         port=8001, 
         log_level="warning",  # Reduce log verbosity 
         access_log=False,  # Disable access logging for better performance
-        workers=1
+        workers=1,
+        ws_max_size=WS_MAX_FRAME_BYTES
     )
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Durable local spool for contact submissions
+Append-only segment files of length-prefixed records with batched fsync,
+replayed into PostgreSQL once the database is reachable again
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+import asyncio
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+# Record frame: 4-byte payload length + 4-byte CRC32, both big-endian
+RECORD_HEADER = struct.Struct('>II')
+ACTIVE_SEGMENT = 'contact-active.spool'
+REPLAY_SUFFIX = '.replay'
+QUARANTINE_SUFFIX = '.quarantine'
+
+SPOOL_DIR = os.environ.get('CONTACT_SPOOL_DIR', 'data/spool')
+SPOOL_FSYNC_INTERVAL = float(os.environ.get('CONTACT_SPOOL_FSYNC_INTERVAL', '0.01'))  # seconds
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """Frame a record as header + compact JSON payload"""
+    payload = json.dumps(record, separators=(',', ':'), default=str).encode()
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+def _frames(f) -> Iterator[Dict[str, Any]]:
+    """Decode frames from the current position, stopping at a torn or corrupt one"""
+    while True:
+        start = f.tell()
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            f.seek(start)
+            return
+        length, checksum = RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            f.seek(start)  # leave the position at the end of the last good record
+            return
+        yield json.loads(payload)
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a segment, stopping at a torn or corrupt tail"""
+    with open(path, 'rb') as f:
+        yield from _frames(f)
+
+def read_segment(path: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """All readable records of a segment, and whether the read reached EOF cleanly"""
+    with open(path, 'rb') as f:
+        records = list(_frames(f))
+        return records, f.tell() == os.fstat(f.fileno()).st_size
+
+class ContactSpool:
+    """Append-only spool with group-commit fsync
+
+    Appends are a single O_APPEND write into the page cache; callers then
+    wait for the next shared fsync, so one fsync covers every record
+    written during the batching interval.
+    """
+    def __init__(self, directory: str, fsync_interval: float):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.active_path = os.path.join(directory, ACTIVE_SEGMENT)
+        self._fd: Optional[int] = None
+        self._sync_waiter: Optional[asyncio.Future] = None
+        self._fd_lock = asyncio.Lock()
+        self.appended = 0
+        self.fsyncs = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._fd is not None
+
+    def open(self):
+        """Create the spool directory and open the active segment for appends"""
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        # A segment left by a previous run may end in a torn record; appending
+        # after it would hide every new record from replay, so seal it first
+        if os.path.exists(self.active_path) and os.path.getsize(self.active_path) > 0:
+            os.rename(self.active_path, self._sealed_path())
+        self._fd = os.open(self.active_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._fsync_directory()
+
+    def close(self):
+        """Flush and close the active segment"""
+        if self._fd is None:
+            return
+        os.fsync(self._fd)
+        self._resolve_waiter(self._sync_waiter)
+        os.close(self._fd)
+        self._fd = None
+
+    async def append(self, record: Dict[str, Any]):
+        """Append one record and return once it is on stable storage"""
+        if self._fd is None:
+            raise OSError("Contact spool is not open")
+        os.write(self._fd, encode_record(record))
+        self.appended += 1
+
+        waiter = self._sync_waiter
+        if waiter is None:
+            waiter = asyncio.get_running_loop().create_future()
+            self._sync_waiter = waiter
+            asyncio.create_task(self._sync_after_interval(waiter))
+        await asyncio.shield(waiter)
+
+    async def _sync_after_interval(self, waiter: asyncio.Future):
+        await asyncio.sleep(self.fsync_interval)
+        async with self._fd_lock:
+            if waiter.done():
+                return  # rotate() or close() already flushed this batch
+            if self._sync_waiter is waiter:
+                self._sync_waiter = None
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, os.fsync, self._fd)
+            except OSError as e:
+                if not waiter.done():
+                    waiter.set_exception(e)
+                return
+            self.fsyncs += 1
+            self._resolve_waiter(waiter)
+
+    def _resolve_waiter(self, waiter: Optional[asyncio.Future]):
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+        if self._sync_waiter is waiter:
+            self._sync_waiter = None
+
+    def _fsync_directory(self):
+        dir_fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    async def rotate(self) -> Optional[str]:
+        """Seal the active segment for replay and start a fresh one"""
+        async with self._fd_lock:
+            if self._fd is None or os.fstat(self._fd).st_size == 0:
+                return None
+            # No awaits below: appends cannot interleave with the swap
+            os.fsync(self._fd)
+            self._resolve_waiter(self._sync_waiter)
+            os.close(self._fd)
+            sealed_path = self._sealed_path()
+            os.rename(self.active_path, sealed_path)
+            self._fd = os.open(self.active_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            self._fsync_directory()
+            return sealed_path
+
+    def _sealed_path(self) -> str:
+        return os.path.join(self.directory, f"contact-{time.time_ns()}{REPLAY_SUFFIX}")
+
+    def quarantine(self, segment: str) -> str:
+        """Set aside a segment whose read stopped before EOF, for manual recovery"""
+        quarantined = segment[:-len(REPLAY_SUFFIX)] + QUARANTINE_SUFFIX
+        os.rename(segment, quarantined)
+        self._fsync_directory()
+        return quarantined
+
+    def quarantined_segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(QUARANTINE_SUFFIX)
+        )
+
+    def pending_segments(self) -> List[str]:
+        """Sealed segments awaiting replay, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(REPLAY_SUFFIX)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Spool snapshot for health output"""
+        return {
+            "open": self.is_open,
+            "appended": self.appended,
+            "fsyncs": self.fsyncs,
+            "pending_segments": len(self.pending_segments()),
+            "quarantined_segments": len(self.quarantined_segments())
+        }
+
+# Global contact spool instance
+contact_spool = ContactSpool(SPOOL_DIR, SPOOL_FSYNC_INTERVAL)
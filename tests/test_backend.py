@@ -27,6 +27,392 @@ def test_app_has_routes():
     from app import app
     assert len(app.routes) > 0
 
+def test_bulkhead_rejects_when_full():
+    """Test that a saturated bulkhead fails fast instead of queueing"""
+    import asyncio
+    from server import Bulkhead, BulkheadFull
+    
+    async def scenario():
+        bulkhead = Bulkhead("test", max_concurrent=1, queue_timeout=0.01)
+        async with bulkhead.slot():
+            assert bulkhead.stats()["in_flight"] == 1
+            try:
+                async with bulkhead.slot():
+                    pass
+            except BulkheadFull:
+                pass
+            else:
+                raise AssertionError("second slot should have been rejected")
+        return bulkhead.stats()
+    
+    stats = asyncio.run(scenario())
+    assert stats == {"in_flight": 0, "waiting": 0, "capacity": 1, "rejected": 1, "completed": 1}
+
+def test_bulkhead_without_queue_admits_until_full():
+    """Test queue_timeout=0 admits while slots are free and rejects only when full"""
+    import asyncio
+    from server import Bulkhead, BulkheadFull
+    
+    async def scenario():
+        bulkhead = Bulkhead("no-queue", max_concurrent=2, queue_timeout=0)
+        async with bulkhead.slot(), bulkhead.slot():
+            assert bulkhead.stats()["in_flight"] == 2
+            try:
+                async with bulkhead.slot():
+                    pass
+            except BulkheadFull:
+                pass
+            else:
+                raise AssertionError("third slot should have been rejected")
+        return bulkhead.stats()
+    
+    stats = asyncio.run(scenario())
+    assert stats == {"in_flight": 0, "waiting": 0, "capacity": 2, "rejected": 1, "completed": 2}
+
+def test_admin_api_requires_token():
+    """Test admin endpoints are hidden without a token and reject bad ones"""
+    import server
+    from fastapi.testclient import TestClient
+    
+    client = TestClient(server.app)
+    original = server.ADMIN_API_TOKEN
+    try:
+        server.ADMIN_API_TOKEN = ''
+        assert client.get('/api/admin/contact-submissions').status_code == 404
+        server.ADMIN_API_TOKEN = 'test-token'
+        response = client.get('/api/admin/contact-submissions', headers={'Authorization': 'Bearer wrong'})
+        assert response.status_code == 401
+    finally:
+        server.ADMIN_API_TOKEN = original
+
+def test_open_breaker_maps_to_503():
+    """Test DatabaseUnavailable from any handler becomes a 503 with Retry-After"""
+    import server
+    from fastapi.testclient import TestClient
+    from database import DatabaseUnavailable
+    
+    async def breaker_open(*args):
+        raise DatabaseUnavailable("Database circuit breaker is open")
+    
+    originals = (server.ADMIN_API_TOKEN, server.DATABASE_CONNECTED, server.list_contact_submissions)
+    server.ADMIN_API_TOKEN, server.DATABASE_CONNECTED, server.list_contact_submissions = 'test-token', True, breaker_open
+    try:
+        client = TestClient(server.app)
+        response = client.get('/api/admin/contact-submissions', headers={'Authorization': 'Bearer test-token'})
+        assert response.status_code == 503
+        assert response.headers.get('retry-after') == '30'
+    finally:
+        server.ADMIN_API_TOKEN, server.DATABASE_CONNECTED, server.list_contact_submissions = originals
+
+def test_export_encoding_streams_csv_and_gzip():
+    """Test exports stream per chunk, neutralise formulas and gzip cleanly"""
+    import asyncio
+    import csv
+    import gzip
+    import io
+    from datetime import datetime, timezone
+    from export import encode_export
+    
+    rows = [
+        {"id": i, "name": "=HYPERLINK(1)" if i == 0 else f"Lead {i}",
+         "submitted_at": datetime(2026, 10, 19, tzinfo=timezone.utc), "metadata": {"k": i}}
+        for i in range(500)
+    ]
+    
+    async def source():
+        for row in rows:
+            yield row
+    
+    async def collect(export_format, compress):
+        return [chunk async for chunk in encode_export(
+            source(), export_format, ["id", "name", "submitted_at", "metadata"], compress, chunk_size=4096
+        )]
+    
+    chunks = asyncio.run(collect("csv", False))
+    assert len(chunks) > 2  # first row flushed early, the rest in bounded chunks
+    parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert parsed[0] == ["id", "name", "submitted_at", "metadata"]
+    assert parsed[1][1] == "'=HYPERLINK(1)"
+    assert len(parsed) == 501
+    
+    compressed = b"".join(asyncio.run(collect("ndjson", True)))
+    lines = gzip.decompress(compressed).decode().splitlines()
+    assert len(lines) == 500 and '"k":499' in lines[-1]
+
+def test_contact_retry_is_replayed_from_idempotency_cache():
+    """Test a retried submission is answered from cache without a fresh CSRF token"""
+    import server
+    from fastapi.testclient import TestClient
+    
+    client = TestClient(server.app)
+    token = client.post('/api/csrf-token').json()['csrf_token']
+    form = {"name": "Retry Lead", "email": "retry@example.com", "message": "Please call me back", "csrf_token": token}
+    headers = {"Idempotency-Key": "contact-retry-test-0001"}
+    
+    first = client.post('/api/contact', json=form, headers=headers)
+    assert first.status_code == 200
+    # Same key and body: the used CSRF token is never re-checked
+    retry = client.post('/api/contact', json=form, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers.get('idempotent-replayed') == 'true'
+    
+    changed = client.post('/api/contact', json={**form, "message": "Different"}, headers=headers)
+    assert changed.status_code == 422
+    assert client.post('/api/contact', json=form, headers={"Idempotency-Key": "bad key!"}).status_code == 400
+
+def test_contact_queue_mode_accepts_then_sheds():
+    """Test queue mode answers 202 with a submission id and 503 once the queue is full"""
+    import asyncio
+    import server
+    from fastapi.testclient import TestClient
+    
+    original_mode, original_queue = server.CONTACT_QUEUE_MODE, server.contact_queue
+    server.CONTACT_QUEUE_MODE = True
+    server.contact_queue = asyncio.Queue(maxsize=1)
+    try:
+        client = TestClient(server.app)
+        
+        def submit(key):
+            token = client.post('/api/csrf-token').json()['csrf_token']
+            form = {"name": "Queued Lead", "email": "queued@example.com", "message": key, "csrf_token": token}
+            return client.post('/api/contact', json=form, headers={"Idempotency-Key": key})
+        
+        accepted = submit("contact-queue-test-0001")
+        assert accepted.status_code == 202
+        body = accepted.json()
+        assert body["status"] == "accepted"
+        queued = server.contact_queue.get_nowait()
+        assert queued["id"] == body["submission_id"]
+        server.contact_queue.put_nowait(queued)
+        
+        # No consumers are running, so the single slot stays taken
+        shed = submit("contact-queue-test-0002")
+        assert shed.status_code == 503
+        assert shed.headers.get('retry-after') == '5'
+        
+        record = server.prepare_queued_contact({**queued, "email": "not-an-email"})
+        assert record is None
+    finally:
+        server.CONTACT_QUEUE_MODE, server.contact_queue = original_mode, original_queue
+
+def test_request_models_reject_oversized_and_malformed_input():
+    """Test contact and WebSocket payloads are bounded by the validators, and WebSocket JSON parses"""
+    import json
+    import server
+    from fastapi.testclient import TestClient
+    
+    client = TestClient(server.app)
+    form = {"name": "Bounded Lead", "email": "bounded@example.com", "message": "Hello", "csrf_token": "x"}
+    for field, value in (("message", "x" * (server.CONTACT_MESSAGE_MAX_LENGTH + 1)),
+                         ("name", 12345), ("email", "not-an-email")):
+        response = client.post('/api/contact', json={**form, field: value})
+        assert response.status_code == 422, field
+        assert response.json()["detail"][0]["loc"] == ["body", field]
+    
+    with client.websocket_connect('/ws/model-test-client') as websocket:
+        websocket.send_text(json.dumps({"type": "ping"}))
+        assert websocket.receive_json()["type"] == "pong"
+        websocket.send_text(json.dumps({"type": "echo", "content": "hi <b>there</b>"}))
+        assert websocket.receive_json()["content"] == "hi there"
+        websocket.send_text('{"type": ')
+        assert websocket.receive_json()["code"] == "INVALID_JSON"
+        websocket.send_text(json.dumps({"type": "echo", "content": "x" * (server.WS_CONTENT_MAX_LENGTH + 1)}))
+        assert websocket.receive_json()["code"] == "INVALID_FORMAT"
+        websocket.send_text(json.dumps({"type": "shout"}))
+        assert websocket.receive_json()["code"] == "UNKNOWN_TYPE"
+        websocket.send_text("x" * (server.WS_MESSAGE_MAX_LENGTH + 1))
+        assert websocket.receive_json()["code"] == "MESSAGE_TOO_LARGE"
+
+def test_websocket_client_id_truncated_before_validation():
+    """Test long client ids are cut to 50 characters and accepted, as before; invalid ones are refused"""
+    import json
+    import server
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+    
+    client = TestClient(server.app)
+    with client.websocket_connect('/ws/' + 'a' * 80) as websocket:
+        websocket.send_text(json.dumps({"type": "ping"}))
+        assert websocket.receive_json()["type"] == "pong"
+    
+    try:
+        with client.websocket_connect('/ws/bad%20id%21') as websocket:
+            websocket.receive_json()
+    except WebSocketDisconnect as e:
+        assert e.code == 1008
+    else:
+        raise AssertionError("invalid client id should be refused")
+
+def test_request_limits_reject_large_and_slow_bodies():
+    """Test bodies are capped per route while streaming and a stalled body times out"""
+    import asyncio
+    import server
+    from fastapi.testclient import TestClient
+    from limits import RequestLimitsMiddleware, request_limit_stats
+    
+    client = TestClient(server.app)
+    limit = server.ROUTE_BODY_LIMITS["/api/contact"]
+    
+    before = request_limit_stats["content_length_rejected"]
+    response = client.post('/api/contact', content=b'{' + b' ' * limit + b'}',
+                           headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+    assert request_limit_stats["content_length_rejected"] == before + 1
+    
+    # Chunked upload: no Content-Length, so the cap is enforced as chunks arrive
+    def chunks():
+        for _ in range(limit // 1024 + 2):
+            yield b' ' * 1024
+    before = request_limit_stats["body_too_large"]
+    response = client.post('/api/contact', content=chunks(), headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+    assert request_limit_stats["body_too_large"] == before + 1
+    
+    async def read_body_app(scope, receive, send):
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    
+    async def slow_client():
+        await asyncio.sleep(1)
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def run_slow_request():
+        sent = []
+        async def send(message):
+            sent.append(message)
+        middleware = RequestLimitsMiddleware(read_body_app, max_body_bytes=1024, body_timeout=0.05)
+        scope = {"type": "http", "method": "POST", "path": "/slow", "headers": []}
+        await middleware(scope, slow_client, send)
+        return sent
+    
+    before = request_limit_stats["body_timeout"]
+    sent = asyncio.run(run_slow_request())
+    assert sent[0]["status"] == 408
+    assert (b"connection", b"close") in sent[0]["headers"]
+    assert request_limit_stats["body_timeout"] == before + 1
+    assert request_limit_stats["by_route"]["/slow"] >= 1
+
+def test_route_deadline_cancels_handler_and_releases_resources():
+    """Test a stuck handler is cancelled with a 504, unwinding its resources, and streams are left alone"""
+    import asyncio
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from fastapi.testclient import TestClient
+    from limits import RouteDeadlineMiddleware, route_deadline_stats
+    
+    app = FastAPI()
+    released = []
+    
+    @asynccontextmanager
+    async def pooled_connection():
+        try:
+            yield
+        finally:
+            released.append(True)
+    
+    @app.middleware("http")
+    async def passthrough(request, call_next):
+        return await call_next(request)
+    
+    @app.get("/api/stuck")
+    async def stuck():
+        async with pooled_connection():
+            await asyncio.sleep(5)
+        return {"status": "late"}
+    
+    @app.get("/api/stream")
+    async def stream():
+        async def body():
+            yield b"first,"
+            await asyncio.sleep(0.2)
+            yield b"second"
+        return StreamingResponse(body())
+    
+    client = TestClient(RouteDeadlineMiddleware(app, default_deadline=0.05))
+    before = route_deadline_stats["timeouts"]
+    response = client.get('/api/stuck')
+    assert response.status_code == 504
+    assert released == [True]
+    assert route_deadline_stats["timeouts"] == before + 1
+    assert route_deadline_stats["by_route"]["/api/stuck"] >= 1
+    
+    # Headers went out before the deadline, so the slow body is not cut off
+    response = client.get('/api/stream')
+    assert response.status_code == 200
+    assert response.content == b"first,second"
+
+def test_contact_spooled_when_insert_hits_connection_error():
+    """Test a connection error before the breaker trips still spools the lead instead of a 500"""
+    import tempfile
+    import server
+    from fastapi.testclient import TestClient
+    from spool import ContactSpool
+    
+    async def failing_insert(data):
+        raise ConnectionError("connection reset by peer")
+    
+    spool = ContactSpool(tempfile.mkdtemp(), fsync_interval=0.01)
+    spool.open()
+    originals = (server.DATABASE_CONNECTED, server.insert_contact_submission, server.contact_spool)
+    server.DATABASE_CONNECTED, server.insert_contact_submission, server.contact_spool = True, failing_insert, spool
+    try:
+        client = TestClient(server.app)
+        token = client.post('/api/csrf-token').json()['csrf_token']
+        form = {"name": "Outage Lead", "email": "outage@example.com", "message": "Call me", "csrf_token": token}
+        response = client.post('/api/contact', json=form, headers={"Idempotency-Key": "contact-outage-test-01"})
+        assert response.status_code == 200
+        assert spool.appended == 1
+    finally:
+        server.DATABASE_CONNECTED, server.insert_contact_submission, server.contact_spool = originals
+        spool.close()
+
+def test_supervisor_keeps_pool_through_isolated_health_check_failures():
+    """Test only a run of failed health checks drops the pool - one slow ping does not"""
+    import asyncio
+    import server
+    
+    pings = iter([False, False, True, False, False, False])
+    calls = {"connect": 0, "disconnect": 0, "pings": 0}
+    
+    async def connect():
+        calls["connect"] += 1
+    
+    async def check_schema():
+        return "current"
+    
+    async def ping(timeout):
+        calls["pings"] += 1
+        return next(pings, True)
+    
+    async def disconnect():
+        calls["disconnect"] += 1
+    
+    async def scenario():
+        task = asyncio.create_task(server.database_supervisor())
+        while calls["pings"] < 8:
+            await asyncio.sleep(0.005)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    
+    manager = server.db_manager
+    originals = (server.DATABASE_CONNECTED, server.DB_HEALTH_CHECK_INTERVAL, manager.connect,
+                 manager.check_schema, manager.ping, manager.disconnect)
+    server.DATABASE_CONNECTED, server.DB_HEALTH_CHECK_INTERVAL = False, 0.001
+    manager.connect, manager.check_schema, manager.ping, manager.disconnect = connect, check_schema, ping, disconnect
+    try:
+        asyncio.run(scenario())
+        # Two misses then a success reset the count; the later run of three reconnects once
+        assert calls["disconnect"] == 1
+        assert calls["connect"] == 2
+    finally:
+        (server.DATABASE_CONNECTED, server.DB_HEALTH_CHECK_INTERVAL, manager.connect,
+         manager.check_schema, manager.ping, manager.disconnect) = originals
+        server.database_state["health_check_failures"] = 0
+
 if __name__ == "__main__":
     print("Running backend smoke tests...")
     test_imports()
@@ -37,4 +423,30 @@ if __name__ == "__main__":
     print("✅ Health endpoint exists")
     test_app_has_routes()
     print("✅ Routes configured")
+    test_bulkhead_rejects_when_full()
+    print("✅ Bulkhead rejects when full")
+    test_bulkhead_without_queue_admits_until_full()
+    print("✅ Bulkhead without a queue admits until full")
+    test_admin_api_requires_token()
+    print("✅ Admin API requires token")
+    test_open_breaker_maps_to_503()
+    print("✅ Open breaker maps to 503")
+    test_export_encoding_streams_csv_and_gzip()
+    print("✅ Export encoding streams CSV and gzip")
+    test_contact_retry_is_replayed_from_idempotency_cache()
+    print("✅ Contact retries replayed from idempotency cache")
+    test_contact_spooled_when_insert_hits_connection_error()
+    print("✅ Contact spooled on connection errors")
+    test_contact_queue_mode_accepts_then_sheds()
+    print("✅ Contact queue mode accepts then sheds")
+    test_request_models_reject_oversized_and_malformed_input()
+    print("✅ Request models reject oversized and malformed input")
+    test_websocket_client_id_truncated_before_validation()
+    print("✅ WebSocket client ids truncated before validation")
+    test_request_limits_reject_large_and_slow_bodies()
+    print("✅ Request limits reject large and slow bodies")
+    test_route_deadline_cancels_handler_and_releases_resources()
+    print("✅ Route deadlines cancel stuck handlers")
+    test_supervisor_keeps_pool_through_isolated_health_check_failures()
+    print("✅ Supervisor keeps the pool through isolated health check failures")
     print("\n🎉 All backend smoke tests passed!")
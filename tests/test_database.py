@@ -0,0 +1,573 @@
+"""Database layer tests (no live PostgreSQL required)"""
+import sys
+import os
+import asyncio
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test breaker fails fast while open and closes after a good probe"""
+    from database import DatabaseCircuitBreaker, DatabaseUnavailable
+    
+    breaker = DatabaseCircuitBreaker(
+        failure_threshold=2, reset_timeout=0.05, call_timeout=0.5,
+        max_retries=0, retry_base_delay=0, retry_budget_ratio=0.2
+    )
+    calls = []
+    
+    async def failing():
+        calls.append("fail")
+        raise ConnectionError("db down")
+    
+    async def succeeding():
+        calls.append("ok")
+        return 1
+    
+    async def scenario():
+        for _ in range(2):
+            try:
+                await breaker.call(failing)
+            except ConnectionError:
+                pass
+        assert breaker.state == breaker.OPEN
+        
+        try:
+            await breaker.call(succeeding)
+        except DatabaseUnavailable:
+            pass
+        else:
+            raise AssertionError("open breaker should not call the database")
+        
+        await asyncio.sleep(0.06)
+        assert await breaker.call(succeeding) == 1
+        assert breaker.state == breaker.CLOSED
+    
+    asyncio.run(scenario())
+    assert calls == ["fail", "fail", "ok"]
+
+def test_circuit_breaker_guard_gates_streams():
+    """Test guard() admits one half-open probe, counts its first row and reopens on a stream failure"""
+    from database import DatabaseCircuitBreaker, DatabaseUnavailable
+    
+    breaker = DatabaseCircuitBreaker(
+        failure_threshold=1, reset_timeout=0.05, call_timeout=0.5,
+        max_retries=0, retry_base_delay=0, retry_budget_ratio=0.2
+    )
+    
+    async def stream(rows, error=None):
+        async with breaker.guard() as record_success:
+            for row in rows:
+                record_success()
+                yield row
+            if error:
+                raise error
+    
+    async def scenario():
+        try:
+            async for _ in stream([1], ConnectionError("reset mid-stream")):
+                pass
+        except ConnectionError:
+            pass
+        assert breaker.state == breaker.OPEN
+        
+        try:
+            async with breaker.guard():
+                pass
+        except DatabaseUnavailable:
+            pass
+        else:
+            raise AssertionError("open breaker should not admit a stream")
+        
+        await asyncio.sleep(0.06)
+        probe = stream([1, 2, 3])
+        assert await probe.__anext__() == 1
+        assert breaker.state == breaker.CLOSED  # the first row proved the database healthy
+        await probe.aclose()
+        assert not breaker.probe_in_flight
+    
+    asyncio.run(scenario())
+
+def test_naive_time_bounds_are_taken_as_utc():
+    """Test search, export and timeseries bounds share one UTC normalization"""
+    from datetime import datetime, timedelta, timezone
+    from database import as_utc
+    
+    assert as_utc(None) is None
+    assert as_utc(datetime(2026, 10, 19, 12)) == datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+    plus_two = timezone(timedelta(hours=2))
+    converted = as_utc(datetime(2026, 10, 19, 14, tzinfo=plus_two))
+    assert converted.tzinfo is timezone.utc and converted.hour == 12
+
+def test_circuit_breaker_deadline_and_retry_budget():
+    """Test slow calls time out and retries stop when the budget is spent"""
+    from database import DatabaseCircuitBreaker
+    
+    breaker = DatabaseCircuitBreaker(
+        failure_threshold=10, reset_timeout=30, call_timeout=0.01,
+        max_retries=3, retry_base_delay=0, retry_budget_ratio=0.2
+    )
+    breaker.retry_tokens = 1
+    attempts = []
+    
+    async def slow():
+        attempts.append(1)
+        await asyncio.sleep(1)
+    
+    async def scenario():
+        try:
+            await breaker.call(slow)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("slow call should hit its deadline")
+    
+    asyncio.run(scenario())
+    assert len(attempts) == 2  # first try plus the single budgeted retry
+    assert breaker.timeouts == 2
+
+def test_spool_group_commit_and_torn_tail(tmp_path=None):
+    """Test spooled records survive rotation and a torn tail is ignored"""
+    import tempfile
+    from spool import ContactSpool, read_records
+    
+    directory = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    spool = ContactSpool(directory, fsync_interval=0.01)
+    spool.open()
+    
+    async def scenario():
+        await asyncio.gather(*[spool.append({"id": str(i)}) for i in range(50)])
+        return await spool.rotate()
+    
+    segment = asyncio.run(scenario())
+    spool.close()
+    assert spool.fsyncs == 1  # one fsync covered the whole batch
+    assert spool.pending_segments() == [segment]
+    
+    with open(segment, 'ab') as f:
+        f.write(b'\x00\x00\x01')  # simulate a crash mid-write
+    assert [r["id"] for r in read_records(segment)] == [str(i) for i in range(50)]
+
+def test_spool_reopen_after_crash_keeps_later_records(tmp_path=None):
+    """Test records appended after a torn tail are replayed and the damaged segment is quarantined"""
+    import tempfile
+    import server
+    from spool import ContactSpool, read_segment
+    
+    directory = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    spool = ContactSpool(directory, fsync_interval=0.01)
+    spool.open()
+    
+    async def append(*ids):
+        await asyncio.gather(*[spool.append({"id": i}) for i in ids])
+    
+    asyncio.run(append("a", "b"))
+    spool.close()
+    with open(spool.active_path, 'ab') as f:
+        f.write(b'\x00\x00\x01')  # crash mid-write
+    
+    spool.open()  # restart: the damaged segment is sealed, not appended to
+    asyncio.run(append("c", "d"))
+    [damaged] = spool.pending_segments()
+    assert read_segment(damaged) == ([{"id": "a"}, {"id": "b"}], False)
+    
+    replayed_ids = []
+    async def fake_bulk_ingest(table, records, **kwargs):
+        replayed_ids.extend(record["id"] for record in records)
+        return len(records)
+    
+    original_spool, original_ingest = server.contact_spool, server.bulk_ingest
+    server.contact_spool, server.bulk_ingest = spool, fake_bulk_ingest
+    try:
+        assert asyncio.run(server.replay_contact_spool()) == 4
+    finally:
+        server.contact_spool, server.bulk_ingest = original_spool, original_ingest
+        spool.close()
+    
+    assert replayed_ids == ["a", "b", "c", "d"]
+    assert spool.pending_segments() == []
+    assert [os.path.basename(p) for p in spool.quarantined_segments()] == [
+        os.path.basename(damaged).replace('.replay', '.quarantine')
+    ]
+
+def test_bulk_ingest_batches_go_through_the_breaker():
+    """Test failing COPY batches open the breaker and an open breaker stops the next ingest"""
+    import database
+    from database import DatabaseCircuitBreaker, DatabaseUnavailable
+    
+    breaker = DatabaseCircuitBreaker(failure_threshold=2, reset_timeout=60, call_timeout=1,
+                                     max_retries=2, retry_base_delay=0, retry_budget_ratio=0.2)
+    attempts = []
+    
+    def unreachable_connection():
+        attempts.append(True)
+        raise ConnectionError("database went away")
+    
+    records = [{"event_type": "test", "details": {}} for _ in range(3)]
+    
+    async def scenario():
+        for _ in range(2):
+            try:
+                await database.bulk_ingest('security_logs', records, batch_size=1)
+            except ConnectionError:
+                pass
+        try:
+            await database.bulk_ingest('security_logs', records, batch_size=1)
+        except DatabaseUnavailable:
+            return
+        raise AssertionError("open breaker should reject the batch")
+    
+    original_breaker, original_connection = database.db_breaker, database.database.connection
+    database.db_breaker, database.database.connection = breaker, unreachable_connection
+    try:
+        asyncio.run(scenario())
+    finally:
+        database.db_breaker, database.database.connection = original_breaker, original_connection
+    
+    assert len(attempts) == 2  # one attempt per batch call, no retries
+    assert breaker.state == breaker.OPEN
+    assert breaker.rejected == 1
+
+def test_partition_creation_continues_past_a_failed_day():
+    """Test one day's CREATE failing does not stop the later days from being created"""
+    import database
+    from datetime import datetime, timedelta, timezone
+    
+    today = datetime.now(timezone.utc).date()
+    blocked = database.security_log_partition_name(today + timedelta(days=1))
+    executed = []
+    
+    async def no_partitions():
+        return {}
+    
+    async def execute(sql, values=None):
+        if blocked in sql:
+            raise RuntimeError("updated partition constraint for default partition would be violated")
+        executed.append(sql)
+    
+    original_list, original_execute = database.list_security_log_partitions, database.database.execute
+    database.list_security_log_partitions, database.database.execute = no_partitions, execute
+    try:
+        created, failed = asyncio.run(database.ensure_security_log_partitions(days_ahead=3))
+    finally:
+        database.list_security_log_partitions, database.database.execute = original_list, original_execute
+    
+    assert list(failed) == [blocked]
+    assert created == [database.security_log_partition_name(today + timedelta(days=offset)) for offset in (0, 2, 3)]
+
+def test_sync_engine_is_lazy():
+    """Test importing the database layer does not build the psycopg2 engine"""
+    import database
+    assert database._engine is None
+    assert database.get_schema_head() is not None
+
+def test_fast_path_sql_matches_tables():
+    """Test fast-path statements only reference real columns"""
+    import re
+    import database
+    
+    tables = {t.name: set(t.columns.keys()) for t in database.metadata.sorted_tables}
+    for sql in database.FAST_PATH_SQL.values():
+        match = re.match(r"INSERT INTO (\w+) \(([^)]*)\)", sql)
+        table, columns = match.group(1), [c.strip() for c in match.group(2).split(',')]
+        assert set(columns) <= tables[table], sql
+    
+    assert database._inet_arg('unknown') is None
+    assert database._inet_arg('10.0.0.1') == '10.0.0.1'
+
+def test_uuid7_is_time_ordered():
+    """Test uuid7 keys are version 7, unique and sort in generation order"""
+    from database import uuid7
+    
+    keys = [uuid7() for _ in range(10000)]
+    assert all(key.version == 7 for key in keys)
+    assert len(set(keys)) == len(keys)
+    assert keys == sorted(keys)
+
+def test_security_event_rollup_accumulates_and_keeps_counts_on_outage():
+    """Test events share minute buckets, survive an unsent flush and are not re-added after a timeout"""
+    from datetime import datetime, timezone
+    import database
+    
+    rollup = database.SecurityEventRollup()
+    minute = datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)
+    for second in range(0, 60, 10):
+        rollup.record(minute.replace(second=second), "rate_limit_exceeded", "medium")
+    rollup.record(minute.replace(minute=31), "rate_limit_exceeded", "medium")
+    rollup.record(minute, "csrf_validation_failed", "high")
+    assert rollup.pending == 3
+    
+    async def unavailable(operation, **kwargs):
+        raise database.DatabaseUnavailable("breaker open")
+    
+    async def timed_out(operation, **kwargs):
+        assert kwargs.get('max_retries') == 0  # a retried increment could apply twice
+        raise asyncio.TimeoutError()
+    
+    original_call = database.db_breaker.call
+    try:
+        database.db_breaker.call = unavailable
+        try:
+            asyncio.run(rollup.flush())
+        except database.DatabaseUnavailable:
+            pass
+        assert rollup._counts[(minute, "rate_limit_exceeded", "medium")] == 6
+        assert rollup.pending == 3
+        assert rollup.flushed_rows == 0
+        
+        # A timeout may have landed after the commit - counts are reported, not re-added
+        database.db_breaker.call = timed_out
+        try:
+            asyncio.run(rollup.flush())
+        except asyncio.TimeoutError:
+            pass
+        assert rollup.pending == 0
+        assert rollup.unknown_events == 8
+    finally:
+        database.db_breaker.call = original_call
+
+def test_security_log_archive_round_trip(tmp_path=None):
+    """Test archived rows scan back by time range with whole files pruned"""
+    import tempfile
+    import uuid
+    from datetime import datetime, timedelta, timezone
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+    import archive_security_logs as archiver
+    
+    directory = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    manifest = archiver.load_manifest(directory)
+    
+    async def day_rows(day):
+        for minute in range(0, 1440, 10):
+            yield {"id": uuid.uuid4(), "event_type": "rate_limit_exceeded" if minute % 20 else "csrf_validation_failed",
+                   "timestamp": start + timedelta(days=day, minutes=minute), "client_ip": "10.0.0.1",
+                   "details": {"minute": minute}, "severity": "medium"}
+    
+    for day in range(3):
+        name = f"security_logs-2026010{day + 1}.ndjson.gz"
+        entry = asyncio.run(archiver.write_archive_file(day_rows(day), os.path.join(directory, name), 'ndjson'))
+        entry.update({"file": name, "day": f"2026-01-0{day + 1}", "removed": True})
+        manifest['files'].append(entry)
+    archiver.save_manifest(directory, manifest)
+    assert manifest['files'][0]['rows'] == 144
+    
+    # The 2026-01-01 file is never opened; prove it by corrupting it
+    with open(os.path.join(directory, "security_logs-20260101.ndjson.gz"), 'wb') as f:
+        f.write(b"not gzip")
+    rows = list(archiver.scan_archive(
+        directory, start + timedelta(days=1, hours=23), start + timedelta(days=2, hours=1),
+        event_type="csrf_validation_failed"
+    ))
+    assert [row['details']['minute'] for row in rows] == [1380, 1400, 1420, 0, 20, 40]
+
+def test_query_instrumentation_names_times_and_redacts():
+    """Test statements get stable names, histograms fill and slow logs hide values"""
+    import io
+    import contextlib
+    import database
+    from instrumentation import InstrumentedDatabase, statement_name, rows_from_status
+    
+    query = database.contact_submissions.select().where(database.contact_submissions.c.email == 'lead@example.com')
+    assert statement_name(query) == 'select contact_submissions'
+    assert statement_name(database.security_logs.insert()) == 'insert security_logs'
+    assert statement_name('SELECT count(*) FROM security_logs WHERE "timestamp" >= :since') == 'select security_logs'
+    assert rows_from_status('INSERT 0 1') == 1 and rows_from_status('DELETE 250') == 250
+    
+    db = InstrumentedDatabase('postgresql://localhost/instrumentation_test', slow_query_ms=5)
+    
+    async def scenario():
+        async with db.observe('select contact_submissions', query) as result:
+            result["rows"] = 3
+        async with db.observe('select contact_submissions', query) as result:
+            await asyncio.sleep(0.01)
+            result["rows"] = 1
+    
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        asyncio.run(scenario())
+    
+    stats = db.stats()["queries"]["select contact_submissions"]
+    assert stats["count"] == 2 and stats["rows"] == 4 and stats["slow"] == 1
+    assert sum(stats["histogram"].values()) == 2
+    assert "Slow query select contact_submissions" in output.getvalue()
+    assert "lead@example.com" not in output.getvalue()
+    assert "<str len=16>" in output.getvalue()
+
+def test_pool_options_carry_session_limits():
+    """Test pool sizing and per-connection server settings reach asyncpg"""
+    import database
+    
+    kwargs = database.database._backend._get_connection_kwargs()
+    assert kwargs['min_size'] <= kwargs['max_size']
+    settings = kwargs['server_settings']
+    assert settings['application_name'] == database.DB_APPLICATION_NAME
+    assert int(settings['statement_timeout']) > 0
+    assert int(settings['idle_in_transaction_session_timeout']) > 0
+    assert database.db_manager.pool_stats() == {"open": False}
+
+def test_pool_init_warms_the_statement_cache():
+    """Test the pool init hook fills the cache fetchval()/execute() read, one entry per fast-path statement"""
+    import inspect
+    import database
+    from asyncpg.connection import Connection
+    
+    # The hook relies on _get_statement caching by default - fail loudly if asyncpg changes that
+    assert inspect.signature(Connection._get_statement).parameters['use_cache'].default is True
+    assert database.get_pool_options()['init'] is database.warm_statement_cache
+    
+    class FakeConnection:
+        def __init__(self):
+            self._stmt_cache = {}
+        
+        async def _get_statement(self, query, timeout, *, use_cache=True):
+            if 'idempotency_key' in query:
+                raise RuntimeError('column "idempotency_key" does not exist')
+            self._stmt_cache[query] = object()
+    
+    connection = FakeConnection()
+    asyncio.run(database.warm_statement_cache(connection))
+    expected = [sql for sql in database.FAST_PATH_SQL.values() if 'idempotency_key' not in sql]
+    assert len(connection._stmt_cache) == len(expected) > 0
+    assert database.pool_warmup_stats["failed"] >= 1  # a lagging schema never blocks the connection
+
+def test_ping_uses_a_dedicated_connection():
+    """Test the health ping bypasses the pool and replaces a broken connection"""
+    import database
+    
+    class FakeConnection:
+        def __init__(self, healthy):
+            self.healthy = healthy
+            self.terminated = False
+        
+        def is_closed(self):
+            return self.terminated
+        
+        async def fetchval(self, sql):
+            if not self.healthy:
+                raise ConnectionError("connection reset by peer")
+            return 1
+        
+        def terminate(self):
+            self.terminated = True
+    
+    opened = []
+    
+    async def connect(dsn, **kwargs):
+        opened.append(FakeConnection(healthy=len(opened) != 1))
+        return opened[-1]
+    
+    async def saturated_pool(*args, **kwargs):
+        await asyncio.sleep(60)  # every pooled connection is busy
+    
+    manager = database.DatabaseManager()
+    original_connect = database.asyncpg.connect
+    database.asyncpg.connect, manager.database.fetch_val = connect, saturated_pool
+    try:
+        assert asyncio.run(manager.ping(timeout=0.5))
+        opened[0].terminate()  # server closed the idle health connection
+        assert not asyncio.run(manager.ping(timeout=0.5))
+        assert opened[1].terminated and manager._ping_connection is None
+        assert asyncio.run(manager.ping(timeout=0.5))
+        assert len(opened) == 3
+    finally:
+        database.asyncpg.connect = original_connect
+        del manager.database.fetch_val
+
+def test_retried_inserts_resend_the_same_key():
+    """Test a retry after a timeout resends the same key to an insert that ignores duplicates"""
+    import database
+    
+    attempts = []
+    
+    async def commits_then_times_out(sql_name, *args):
+        attempts.append((sql_name, args))
+        if len(attempts) == 1:
+            raise asyncio.TimeoutError()  # committed server-side, reply lost
+        return "INSERT 0 0"
+    
+    original = database._fast_execute, database.DB_FAST_PATH
+    database._fast_execute, database.DB_FAST_PATH = commits_then_times_out, True
+    try:
+        asyncio.run(database.insert_security_log('rate_limit_exceeded', '10.0.0.1', {}, 'high',
+                                                 durability=database.DURABILITY_DURABLE))
+    finally:
+        database._fast_execute, database.DB_FAST_PATH = original
+        database.security_event_rollup._counts.clear()
+    
+    assert len(attempts) == 2 and attempts[0] == attempts[1]
+    for name in ('insert_security_log', 'insert_security_log_async_commit'):
+        assert database.FAST_PATH_SQL[name].endswith("ON CONFLICT (id, timestamp) DO NOTHING")
+    assert database.FAST_PATH_SQL['insert_session'].endswith("ON CONFLICT (id) DO NOTHING")
+
+def test_security_log_durability_tiers():
+    """Test security logs commit asynchronously unless a call asks for durability"""
+    import database
+    
+    executed = []
+    stamped = []
+    
+    async def fake_fast_execute(sql_name, *args):
+        executed.append(sql_name)
+        stamped.append(args[2])
+    
+    async def direct(operation):
+        return await operation()
+    
+    original = database._fast_execute, database.db_breaker.call, database.DB_FAST_PATH
+    database._fast_execute, database.db_breaker.call, database.DB_FAST_PATH = fake_fast_execute, direct, True
+    try:
+        asyncio.run(database.insert_security_log('rate_limit_exceeded', '10.0.0.1', {}, 'high'))
+        asyncio.run(database.insert_security_log('admin_auth_failed', '10.0.0.1', {}, 'medium',
+                                                 durability=database.DURABILITY_DURABLE))
+        # The rollup buckets by the timestamp written to the row, not a later clock read
+        bucket = stamped[0].replace(second=0, microsecond=0)
+        assert database.security_event_rollup._counts[(bucket, 'rate_limit_exceeded', 'high')] == 1
+    finally:
+        database._fast_execute, database.db_breaker.call, database.DB_FAST_PATH = original
+        database.security_event_rollup._counts.clear()
+    
+    assert executed == ['insert_security_log_async_commit', 'insert_security_log']
+    assert database.TABLE_DURABILITY['contact_submissions'] == database.DURABILITY_DURABLE
+    assert "set_config('synchronous_commit', 'off', true)" in database.FAST_PATH_SQL['insert_security_log_async_commit']
+
+if __name__ == "__main__":
+    print("Running database tests...")
+    test_circuit_breaker_opens_and_recovers()
+    print("✅ Circuit breaker opens and recovers")
+    test_circuit_breaker_deadline_and_retry_budget()
+    print("✅ Deadlines and retry budget enforced")
+    test_circuit_breaker_guard_gates_streams()
+    print("✅ Breaker guard gates streaming calls")
+    test_naive_time_bounds_are_taken_as_utc()
+    print("✅ Naive time bounds taken as UTC")
+    test_spool_group_commit_and_torn_tail()
+    test_spool_reopen_after_crash_keeps_later_records()
+    print("✅ Spool group commit and torn-tail recovery")
+    test_bulk_ingest_batches_go_through_the_breaker()
+    print("✅ Bulk ingest batches go through the breaker")
+    test_partition_creation_continues_past_a_failed_day()
+    print("✅ Partition creation continues past a failed day")
+    test_sync_engine_is_lazy()
+    print("✅ Sync engine created lazily")
+    test_fast_path_sql_matches_tables()
+    print("✅ Fast-path SQL matches table definitions")
+    test_uuid7_is_time_ordered()
+    print("✅ uuid7 keys are time-ordered")
+    test_security_event_rollup_accumulates_and_keeps_counts_on_outage()
+    print("✅ Security event rollups accumulate and survive outages")
+    test_security_log_archive_round_trip()
+    print("✅ Security log archives scan back by time range")
+    test_query_instrumentation_names_times_and_redacts()
+    print("✅ Query instrumentation names, times and redacts")
+    test_pool_options_carry_session_limits()
+    print("✅ Pool options carry session limits")
+    test_pool_init_warms_the_statement_cache()
+    print("✅ Pool init warms the statement cache")
+    test_ping_uses_a_dedicated_connection()
+    print("✅ Health ping uses a dedicated connection")
+    test_retried_inserts_resend_the_same_key()
+    print("✅ Retried inserts resend the same key")
+    test_security_log_durability_tiers()
+    print("✅ Security log durability tiers applied")
+    print("\n🎉 All database tests passed!")
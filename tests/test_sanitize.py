@@ -0,0 +1,74 @@
+"""Differential tests: fast sanitize_input vs the original bleach-everything version"""
+import sys
+import os
+import random
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bleach
+
+from sanitize_reference import reference_sanitize_input
+
+# Fragments chosen to hit every branch: markup, entities, controls, CRLF,
+# each dangerous pattern, and patterns that only appear after a removal
+FRAGMENTS = [
+    'a', 'Z', ' ', '  ', '\t', '\n', '\r', '\r\n', '\x00', '\x01', '\x0b', '\x0c', '\x1f', '\x7f', '\x85',
+    '<', '>', '&', '&amp;', '&lt;', '&#39;', '&#x3c;', '&nbsp', '&bogus;', '"', "'", '/', '=',
+    '<b>', '</b>', '<script>', '</script>', '<img src=x onerror=alert(1)>', '<!--', '-->', '<![CDATA[',
+    '$', '{', '}', '.', '..', '...', '<script', 'javascript:', 'JavaScript:', 'eval(', 'eval',
+    'java', 'script:', 'ev', 'al(', 'ja$vascript:', 'java..script:', 'evjavascript:al(', 'e{v}al(',
+    'é', 'ß', '中文', '😀', '​', '﻿', '￾', '\ud800', 'ﬁ',
+]
+
+def random_input(rng: random.Random) -> str:
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12)))
+
+def test_matches_reference_on_fuzzed_inputs():
+    """Test the fast path and bleach fallback reproduce the original output exactly"""
+    from server import sanitize_input
+
+    rng = random.Random(20261019)
+    for _ in range(5000):
+        data = random_input(rng)
+        max_length = rng.choice([5, 50, 100, 1000])
+        assert sanitize_input(data, max_length) == reference_sanitize_input(data, max_length), repr(data)
+
+def test_matches_reference_on_edge_cases():
+    """Test truncation, empty input and pattern chains created by earlier removals"""
+    from server import sanitize_input
+
+    cases = [
+        '', '   ', '....', 'javajavascript:script:', 'j$a{v}a..script:', 'eval.(', '..<script>',
+        'x' * 1005, 'x' * 999 + '<b>', 'Tom & Jerry', 'a\r\nb', '<p>Hello</p> {name}', 'Price: $5.00...',
+    ]
+    for data in cases:
+        for max_length in (3, 100, 1000):
+            assert sanitize_input(data, max_length) == reference_sanitize_input(data, max_length), repr(data)
+
+def test_bleach_leaves_untriggered_characters_alone():
+    """Test every character outside the trigger class passes through bleach unchanged"""
+    from server import BLEACH_TRIGGER_PATTERN
+
+    def clean(text):
+        return bleach.clean(text, tags=[], attributes={}, strip=True)
+
+    rng = random.Random(7)
+    codepoints = list(range(0x0, 0x800)) + [0xd800, 0xdfff, 0xfdd0, 0xfeff, 0xfffd, 0xfffe, 0xffff,
+                                            0x1fffe, 0x10ffff] + rng.sample(range(0x800, 0x110000), 1000)
+    for codepoint in codepoints:
+        char = chr(codepoint)
+        if BLEACH_TRIGGER_PATTERN.search(char):
+            continue
+        for text in (char, 'x' + char, char + 'x', char * 2):
+            assert clean(text) == text, hex(codepoint)
+
+if __name__ == "__main__":
+    print("Running sanitizer differential tests...")
+    test_matches_reference_on_fuzzed_inputs()
+    print("✅ Fuzzed inputs match the reference")
+    test_matches_reference_on_edge_cases()
+    print("✅ Edge cases match the reference")
+    test_bleach_leaves_untriggered_characters_alone()
+    print("✅ bleach leaves untriggered characters alone")
+    print("\n🎉 All sanitizer tests passed!")